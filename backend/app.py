@@ -3,17 +3,10 @@
 import os
 from config import config
 from cache import cache
-from extensions import limiter
+from extensions import db, limiter
 from flask import Flask
-from flask_bcrypt import Bcrypt
-from flask_cors import CORS
-from flask_migrate import Migrate
-from flask_sqlalchemy import SQLAlchemy
-from redis import Redis
-
-bcrypt = Bcrypt()
-db = SQLAlchemy()
-migrate = Migrate()
+from json_provider import OrjsonProvider
+from logging_setup import setup_logging
 
 
 def create_app(config_name='default'):
@@ -30,23 +23,32 @@ def create_app(config_name='default'):
     This function:
     1. Creates a new Flask app instance
     2. Loads the configuration based on the provided config_name
-    3. Initializes all extensions with this app instance
+    3. Initializes logging and all extensions with this app instance
     4. Sets up CORS with allowed origins from the config
     5. Registers blueprints for authentication and main routes
     """
+    # Imported here so that importing the module (models, CLI, tests)
+    # does not pay for extensions only needed once an app is built
+    from flask_cors import CORS
+    from flask_migrate import Migrate
+    from redis import Redis
+
+    setup_logging()
+
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.json = OrjsonProvider(app)
 
     db.init_app(app)
-    migrate.init_app(app, db)
-    bcrypt.init_app(app)
+    Migrate(app, db)
 
     from models import User, MenuItem, Cart, Order
 
     cache._redis = Redis(
         host=app.config.get('REDIS_HOST', 'localhost'),
         port=app.config.get('REDIS_PORT', 6379),
-        db=app.config.get('REDIS_DB', 0)
+        db=app.config.get('REDIS_DB', 0),
+        health_check_interval=30
     )
     limiter.init_app(app)
     CORS(app,
@@ -1,14 +1,40 @@
 #!/usr/bin/env python3
 """Implements caching functionality using Redis"""
+import hashlib
+import logging
+import threading
+from cachetools import TLRUCache
 from functools import wraps
 from redis import Redis
-import json
+import orjson
 from typing import Any, Optional, Union, Callable
 import pickle
 
+logger = logging.getLogger(__name__)
+
+# One-byte type tags prefixed to every stored payload so reads can dispatch
+# on the encoding instead of guessing through exception handlers.
+# Counters (int/float) are stored untagged so INCR/DECR keep working on them.
+JSON_TAG = b'J'
+PICKLE_TAG = b'P'
+STR_TAG = b'S'
+RAW_TAG = b'R'
+
+# In-process layer in front of Redis for the cached decorator. Entries are
+# (ttl, value) pairs so each decorated function keeps its own lifetime.
+LOCAL_CACHE_SIZE = 4096
+LOCAL_CACHE_TTL = 60
+_local_cache = TLRUCache(
+    maxsize=LOCAL_CACHE_SIZE,
+    ttu=lambda _key, entry, now: now + entry[0]
+)
+_local_lock = threading.Lock()
+
 class Cache:
     """Redis cache wrapper with advanced features"""
 
+    __slots__ = ('_redis',)
+
     def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0):
         """Initialize Redis connection with fallback handling"""
         try:
@@ -16,13 +42,13 @@ class Cache:
                 host=host,
                 port=port,
                 db=db,
-                decode_responses=True,  # Automatically decode responses to strings
                 socket_timeout=2,  # Add timeout to prevent hanging
-                retry_on_timeout=True  # Auto-retry on timeout
+                retry_on_timeout=True,  # Auto-retry on timeout
+                health_check_interval=30  # Re-check idle connections
             )
             self._redis.ping()  # Test connection
         except Exception as e:
-            print(f"Warning: Redis connection failed - {str(e)}")
+            logger.warning("Redis connection failed: %s", e)
             self._redis = None
 
     def get(self, key: str) -> Optional[Any]:
@@ -35,38 +61,71 @@ class Cache:
             if value is None:
                 return None
 
-            # Try to decode JSON first
+            # Decoders read the payload through a view, so a large value
+            # is not copied just to strip its tag byte
+            tag = value[:1]
+            if tag == JSON_TAG:
+                return orjson.loads(memoryview(value)[1:])
+            if tag == STR_TAG:
+                return str(memoryview(value)[1:], 'utf-8')
+            if tag == RAW_TAG:
+                return value[1:]
+            if tag == PICKLE_TAG:
+                return pickle.loads(memoryview(value)[1:])
+            # Untagged values are numbers written by set or INCR/DECR
             try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                # If not JSON, try to decode pickle
-                try:
-                    return pickle.loads(value.encode())
-                except:
-                    # If all else fails, return raw value
-                    return value
+                return int(value)
+            except ValueError:
+                return float(value)
         except Exception as e:
-            print(f"Cache get error for key {key}: {str(e)}")
+            logger.warning("Cache get failed for key %s: %s", key, e)
             return None
 
+    @staticmethod
+    def _encode(value: Any) -> Union[bytes, int, float]:
+        """Encode a value for storage, tagged by type for get()"""
+        # Scalars Redis stores natively skip the JSON encoder
+        value_type = type(value)
+        if value_type is str:
+            return STR_TAG + value.encode()
+        if value_type is bytes:
+            return RAW_TAG + value
+        if value_type is int or value_type is float:
+            # Untagged so INCR/DECR keep working on counters
+            return value
+        # Prefer JSON, fall back to pickle for non JSON-serializable values
+        try:
+            return JSON_TAG + orjson.dumps(value)
+        except TypeError:
+            return PICKLE_TAG + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
     def set(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
         """Set value in cache with automatic serialization"""
         if not self._redis:
             return False
 
         try:
-            # Try to encode as JSON first
-            try:
-                encoded_value = json.dumps(value)
-            except (TypeError, ValueError):
-                # If JSON encoding fails, use pickle
-                encoded_value = pickle.dumps(value).decode()
-
-            return self._redis.set(key, encoded_value, ex=timeout)
+            return self._redis.set(key, self._encode(value), ex=timeout)
         except Exception as e:
-            print(f"Cache set error for key {key}: {str(e)}")
+            logger.warning("Cache set failed for key %s: %s", key, e)
             return False
 
+    def add(self, key: str, value: Any, timeout: Optional[int] = None) -> Optional[bool]:
+        """Set value only if key does not exist, in a single round trip
+
+        Values are encoded as in set(). Returns True if the key was set,
+        False if it already existed and None if the cache is unavailable.
+        """
+        if not self._redis:
+            return None
+
+        try:
+            return bool(self._redis.set(key, self._encode(value),
+                                        ex=timeout, nx=True))
+        except Exception as e:
+            logger.warning("Cache add failed for key %s: %s", key, e)
+            return None
+
     def delete(self, key: str) -> bool:
         """Delete key from cache"""
         if not self._redis:
@@ -75,7 +134,7 @@ class Cache:
         try:
             return bool(self._redis.delete(key))
         except Exception as e:
-            print(f"Cache delete error for key {key}: {str(e)}")
+            logger.warning("Cache delete failed for key %s: %s", key, e)
             return False
 
     def incr(self, key: str) -> Optional[int]:
@@ -86,7 +145,7 @@ class Cache:
         try:
             return self._redis.incr(key)
         except Exception as e:
-            print(f"Cache increment error for key {key}: {str(e)}")
+            logger.warning("Cache increment failed for key %s: %s", key, e)
             return None
 
     def decr(self, key: str) -> Optional[int]:
@@ -97,7 +156,7 @@ class Cache:
         try:
             return self._redis.decr(key)
         except Exception as e:
-            print(f"Cache decrement error for key {key}: {str(e)}")
+            logger.warning("Cache decrement failed for key %s: %s", key, e)
             return None
 
     def flush(self) -> bool:
@@ -108,27 +167,52 @@ class Cache:
         try:
             return self._redis.flushdb()
         except Exception as e:
-            print(f"Cache flush error: {str(e)}")
+            logger.warning("Cache flush failed: %s", e)
             return False
 
 def cached(timeout: int = 300):
-    """Decorator for caching function results"""
+    """Decorator for caching function results
+
+    Results are kept in a per-process LRU for at most LOCAL_CACHE_TTL
+    seconds in front of Redis, so hot keys skip the network round trip.
+    Other workers do not see invalidations of that local copy, and the
+    cached object is shared between callers, so it must not be mutated.
+    A None result is returned without being cached.
+    """
+    local_ttl = min(timeout, LOCAL_CACHE_TTL)
+
     def decorator(f: Callable) -> Callable:
+        prefix = f"cache:{f.__module__}.{f.__qualname__}:"
+
         @wraps(f)
         def wrapper(*args, **kwargs):
-            # Generate a cache key based on function name and arguments
-            key = f"cache_{f.__name__}_{str(args)}_{str(kwargs)}"
+            # Fixed-size key: digest of the arguments, with kwargs sorted so
+            # call sites passing them in a different order share an entry
+            digest = hashlib.blake2b(
+                repr((args, sorted(kwargs.items()))).encode(),
+                digest_size=16
+            ).hexdigest()
+            key = prefix + digest
+
+            with _local_lock:
+                entry = _local_cache.get(key)
+            if entry is not None:
+                return entry[1]
 
             # Try to get cached result
             result = cache.get(key)
-            if result is not None:
-                return result
-
-            # If no cached result, execute function
-            result = f(*args, **kwargs)
-
-            # Cache the result
-            cache.set(key, result, timeout=timeout)
+            if result is None:
+                # If no cached result, execute function
+                result = f(*args, **kwargs)
+                if result is None:
+                    # Reads as a miss anyway, so storing it saves nothing
+                    return None
+
+                # Cache the result
+                cache.set(key, result, timeout=timeout)
+
+            with _local_lock:
+                _local_cache[key] = (local_ttl, result)
             return result
         return wrapper
     return decorator
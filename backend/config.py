@@ -17,12 +17,31 @@ class Config:
         SQLALCHEMY_DATABASE_URI (str): The URI for the database connection.
         SQLALCHEMY_TRACK_MODIFICATIONS (bool): Flag to track modifications.
         ALLOWED_ORIGINS (list): List of allowed origins for CORS.
+        SQLALCHEMY_ENGINE_OPTIONS (dict): Connection pool and statement
+            timeout settings, overridable through DB_* environment variables.
+        BCRYPT_LOG_ROUNDS (int): bcrypt cost factor used for password hashes.
 
     """
     SECRET_KEY = os.getenv('SECRET_KEY')
     SQLALCHEMY_DATABASE_URI = os.getenv('SQLALCHEMY_DATABASE_URI')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 40)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'pool_pre_ping': True,
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        # Compiled SQL kept per engine; the default 500 is sized for apps
+        # with fewer distinct statements than all model queries combined
+        'query_cache_size': int(os.getenv('DB_QUERY_CACHE_SIZE', 1200)),
+        # Server-side cap on SELECT run time, in milliseconds
+        'connect_args': {
+            'init_command': 'SET SESSION max_execution_time=%d'
+                            % int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000)),
+        },
+    }
     ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', '').split(',')
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
 
 
 class DevelopmentConfig(Config):
@@ -34,9 +53,11 @@ class DevelopmentConfig(Config):
 
     Attributes:
         DEBUG (bool): Flag to enable debug mode.
+        BCRYPT_LOG_ROUNDS (int): Lower bcrypt cost so local logins stay quick.
 
     """
     DEBUG = True
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 10))
 
 
 class ProductionConfig(Config):
@@ -63,11 +84,15 @@ class TestingConfig(Config):
     Attributes:
         TESTING (bool): Flag to enable testing mode.
         SQLALCHEMY_DATABASE_URI (str): The URI for the testing database.
+        SQLALCHEMY_ENGINE_OPTIONS (dict): Default pool, tests run serially.
+        BCRYPT_LOG_ROUNDS (int): Minimum bcrypt cost to keep tests fast.
 
     """
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URI')
+    SQLALCHEMY_ENGINE_OPTIONS = {'pool_pre_ping': True}
     RATELIMIT_ENABLED = False
+    BCRYPT_LOG_ROUNDS = 4
 
 
 config = {
@@ -2,18 +2,19 @@
 """Initializes application extensions"""
 import os
 import redis
-from flask_bcrypt import Bcrypt
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_sqlalchemy import SQLAlchemy
+# Imported for its side effect: registers the batched+redis storage scheme
+import limiter_storage  # noqa: F401
 
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379')
-bcrypt = Bcrypt()
+db = SQLAlchemy()
 
 pool = redis.connection.BlockingConnectionPool.from_url(REDIS_URL)
 limiter = Limiter(
     key_func=get_remote_address,
-    storage_uri=REDIS_URL,
+    storage_uri=f'batched+{REDIS_URL}',
     strategy='fixed-window',
     headers_enabled=True,
     storage_options={'connection_pool': pool},
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Implements a write-batching Redis storage for Flask-Limiter"""
+import logging
+import os
+import threading
+import time
+from limits.storage import RedisStorage
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedRedisStorage(RedisStorage):
+    """Redis rate-limit storage that batches counter increments.
+
+    Fixed-window hits are counted in process and flushed to Redis by a
+    background thread every FLUSH_INTERVAL seconds, with one pipelined
+    round trip per flush instead of one EVALSHA per request. The shared
+    total is read once when a key is first seen in a window and refreshed
+    by every flush, so hits from other workers are seen with a lag of at
+    most one flush interval. Hits being written by a flush stay in the
+    local estimate until its new totals are applied, and are put back as
+    pending if the write fails. Totals of expired windows are pruned by the
+    flush thread every PRUNE_INTERVAL seconds, so keys that are never hit
+    again do not accumulate.
+
+    Registered under the ``batched+redis://`` scheme.
+    """
+
+    STORAGE_SCHEME = ["batched+redis"]
+    FLUSH_INTERVAL = 0.02
+    PRUNE_INTERVAL = 1.0
+
+    def __init__(self, uri: str, **options) -> None:
+        """Initialize storage and local counters"""
+        super().__init__(uri.replace('batched+', '', 1), **options)
+        self._pending: Dict[str, Tuple[int, int]] = {}
+        self._known: Dict[str, Tuple[int, float]] = {}
+        self._inflight: Dict[str, Tuple[int, int]] = {}
+        self._flush_lock = threading.Lock()
+        # Serializes flush() calls so only one batch is ever in flight
+        self._flush_serial = threading.Lock()
+        self._flusher_pid = None
+        self._next_prune = 0.0
+
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False,
+             amount: int = 1) -> int:
+        """Count a hit locally and return the estimated window total"""
+        if elastic_expiry:
+            return super().incr(key, expiry, elastic_expiry, amount)
+
+        self._ensure_flusher()
+        with self._flush_lock:
+            seeded = self._known_count(key) is not None
+        if not seeded:
+            self._seed(key, expiry)
+
+        with self._flush_lock:
+            delta, _ = self._pending.get(key, (0, expiry))
+            delta += amount
+            self._pending[key] = (delta, expiry)
+            return (self._known_count(key) or 0) + self._local_hits(key)
+
+    def get(self, key: str) -> int:
+        """Return the estimated window total including unflushed hits"""
+        with self._flush_lock:
+            local = self._local_hits(key)
+            known = self._known_count(key)
+        if known is None:
+            return super().get(key) + local
+        return known + local
+
+    def clear(self, key: str) -> None:
+        """Drop local state for key and clear it in Redis"""
+        with self._flush_lock:
+            self._pending.pop(key, None)
+            self._inflight.pop(key, None)
+            self._known.pop(key, None)
+        super().clear(key)
+
+    def _local_hits(self, key: str) -> int:
+        """Return hits not yet in the shared total (caller holds the lock)"""
+        return (self._pending.get(key, (0, 0))[0]
+                + self._inflight.get(key, (0, 0))[0])
+
+    def _known_count(self, key: str) -> Optional[int]:
+        """Return the last shared total for key, or None if unknown or expired"""
+        known = self._known.get(key)
+        if known is None:
+            return None
+        count, deadline = known
+        if deadline <= time.monotonic():
+            del self._known[key]
+            return None
+        return count
+
+    def _prune_known(self, now: float) -> None:
+        """Drop shared totals whose window has ended (caller holds the lock)"""
+        expired = [key for key, (_, deadline) in self._known.items()
+                   if deadline <= now]
+        for key in expired:
+            del self._known[key]
+
+    def _seed(self, key: str, expiry: int) -> None:
+        """Load the shared total for a key this process has not seen this window"""
+        prefixed = self.prefixed_key(key)
+        pipe = self.storage.pipeline(transaction=False)
+        pipe.get(prefixed)
+        pipe.pttl(prefixed)
+        count, ttl_ms = pipe.execute()
+        ttl = ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else expiry
+        with self._flush_lock:
+            self._known[key] = (int(count or 0), time.monotonic() + ttl)
+
+    def _ensure_flusher(self) -> None:
+        """Start the flush thread once per process (threads do not survive fork)"""
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._flush_lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+            threading.Thread(target=self._run_flusher,
+                             name='limiter-flush',
+                             daemon=True).start()
+
+    def _run_flusher(self) -> None:
+        """Flush pending increments every FLUSH_INTERVAL seconds"""
+        while True:
+            time.sleep(self.FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Rate limit flush failed: %s", e)
+
+    def flush(self) -> None:
+        """Send pending increments to Redis in a single pipeline"""
+        with self._flush_serial:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Write one batch of pending increments (caller holds _flush_serial)"""
+        with self._flush_lock:
+            now = time.monotonic()
+            if now >= self._next_prune:
+                self._prune_known(now)
+                self._next_prune = now + self.PRUNE_INTERVAL
+            if not self._pending:
+                return
+            self._inflight, self._pending = self._pending, {}
+            inflight = self._inflight
+
+        keys = list(inflight)
+        try:
+            pipe = self.storage.pipeline(transaction=False)
+            for key in keys:
+                delta, expiry = inflight[key]
+                self.lua_incr_expire(keys=[self.prefixed_key(key)],
+                                     args=[expiry, delta], client=pipe)
+                pipe.pttl(self.prefixed_key(key))
+            results = pipe.execute()
+        except Exception:
+            # Hand the batch back so the next flush retries it
+            with self._flush_lock:
+                for key, (delta, expiry) in self._inflight.items():
+                    pending = self._pending.get(key, (0, expiry))[0]
+                    self._pending[key] = (pending + delta, expiry)
+                self._inflight = {}
+            raise
+
+        now = time.monotonic()
+        with self._flush_lock:
+            for i, key in enumerate(keys):
+                total, ttl_ms = int(results[2 * i]), results[2 * i + 1]
+                if ttl_ms and ttl_ms > 0:
+                    self._known[key] = (total, now + ttl_ms / 1000)
+                else:
+                    self._known.pop(key, None)
+            # The new totals include these hits now
+            self._inflight = {}
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Configures application logging with file writes off the request path"""
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+AUTH_LOG_FILE = 'auth.log'
+AUTH_LOG_MAX_BYTES = 10485760
+AUTH_LOG_BACKUP_COUNT = 5
+
+_configured = False
+_lock = threading.Lock()
+
+
+def setup_logging() -> None:
+    """Attach the auth log file handler behind a queue, once per process.
+
+    Request threads only enqueue records; a listener thread formats them
+    and does the file I/O, including rotation. Safe to call from every
+    create_app, since later calls do nothing.
+    """
+    global _configured
+    with _lock:
+        if _configured:
+            return
+        _configured = True
+
+        logging.basicConfig(level=logging.INFO)
+
+        handler = RotatingFileHandler(
+            AUTH_LOG_FILE,
+            maxBytes=AUTH_LOG_MAX_BYTES,
+            backupCount=AUTH_LOG_BACKUP_COUNT,
+            encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - [%(process)d] - %(message)s'
+        ))
+
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, handler)
+        listener.start()
+        atexit.register(listener.stop)
+        logging.getLogger('auth').addHandler(QueueHandler(log_queue))
@@ -6,20 +6,108 @@ other models in the application. It provides common CRUD operations, timestamp
 handling, and UUID-based primary keys.
 """
 import logging
-import uuid
-from app import db
-from datetime import datetime, timezone, UTC
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+import os
+import threading
+import time
+from extensions import db
+from datetime import datetime, UTC
+from sqlalchemy import event, insert, inspect, lambda_stmt, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError, SQLAlchemyError
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.sql import func
-from sqlalchemy.orm import Session
-from typing import Optional, Any, Dict, List, Type, TypeVar
+from sqlalchemy.orm import load_only
+from typing import Optional, Any, Dict, List, TypeVar
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound='BaseModel')
 
+# Primary key format: 7 (time-ordered, default) or 4 (fully random).
+# Time-ordered ids append at the right edge of the primary key index
+# instead of splitting random pages; set UUID_VERSION=4 where many writers
+# contending on that last page is the bigger cost.
+UUID_VERSION = int(os.getenv('UUID_VERSION', 7))
+if UUID_VERSION not in (4, 7):
+    raise ValueError(f"UUID_VERSION must be 4 or 7, got {UUID_VERSION}")
+
+
+class _UuidPool:
+    """Hands out UUID strings built from a pre-read block of entropy.
+
+    One os.urandom call fills UUID_BATCH ids, instead of one call per row.
+    Version 7 ids replace the top 48 random bits with the Unix time in
+    milliseconds. The buffer is dropped in forked children so workers
+    never share ids.
+    """
+    UUID_BATCH = 1024
+
+    _buffer = b''
+    _offset = 0
+    _lock = threading.Lock()
+
+    # Version and RFC 4122 variant bits, applied to the 128-bit integer
+    _CLEAR_MASK = ~((0xf000 << 64) | (0xc000 << 48))
+    _SET_BITS = (UUID_VERSION << 76) | (0x8000 << 48)
+    _RANDOM_MASK = (1 << 80) - 1
+
+    @classmethod
+    def next_uuid_str(cls) -> str:
+        """Return the next UUID as a string"""
+        with cls._lock:
+            if cls._offset >= len(cls._buffer):
+                cls._buffer = os.urandom(16 * cls.UUID_BATCH)
+                cls._offset = 0
+            start = cls._offset
+            cls._offset = start + 16
+            chunk = cls._buffer[start:start + 16]
+        value = int.from_bytes(chunk, 'big')
+        if UUID_VERSION == 7:
+            value = (time.time_ns() // 1_000_000) << 80 | value & cls._RANDOM_MASK
+        # Same text as str(uuid.UUID(...)) without building the UUID object
+        h = '%032x' % (value & cls._CLEAR_MASK | cls._SET_BITS)
+        return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+    @classmethod
+    def _reset(cls) -> None:
+        """Discard buffered entropy (called in forked children)"""
+        cls._buffer = b''
+        cls._offset = 0
+        cls._lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_UuidPool._reset)
+
+# MySQL error codes that can succeed on retry: lock wait timeout,
+# deadlock, and the server connection dropping mid-statement
+_RETRYABLE_MYSQL_ERRORS = frozenset({1205, 1213, 2006, 2013})
+SAVE_RETRY_BACKOFF = 0.01
+
+
+def _is_retryable(error: DBAPIError) -> bool:
+    """Return True for transient errors worth retrying a save for"""
+    if error.connection_invalidated:
+        return True
+    if isinstance(error, OperationalError):
+        args = getattr(error.orig, 'args', ())
+        return bool(args) and args[0] in _RETRYABLE_MYSQL_ERRORS
+    return False
+
+
+# Column type for ids and the foreign keys that reference them. Canonical
+# UUID text is 36 ASCII characters; on MySQL it is stored as ascii CHAR(36)
+# so index entries are 36 bytes rather than up to 160 under utf8mb4, and
+# comparisons are bytewise instead of going through a Unicode collation.
+ID_TYPE = db.String(36).with_variant(
+    mysql.CHAR(36, charset='ascii', collation='ascii_bin'), 'mysql')
+
+# Column types whose values need converting to be JSON serializable
+_CONVERTERS = {
+    db.DateTime: datetime.isoformat,
+    db.Uuid: str,
+}
+
 
 class BaseModel(db.Model):
     """
@@ -37,17 +125,23 @@ class BaseModel(db.Model):
     """
     __abstract__ = True
 
+    SENSITIVE_FIELDS = frozenset({'password_hash', 'password'})
+
+    # Rows per INSERT statement in bulk_create; keeps each statement well
+    # under MySQL's max_allowed_packet
+    BULK_INSERT_CHUNK = 10_000
+
     @declared_attr
     def __tablename__(cls) -> str:
         """Generate table name automatically from class name."""
         return cls.__name__.lower() + 's'
 
-    id = db.Column(db.String(40),
+    # The primary key is already indexed and unique; extra unique/index
+    # flags would make the database maintain duplicate indexes on every insert
+    id = db.Column(ID_TYPE,
                   primary_key=True,
-                  default=lambda: str(uuid.uuid4()),
-                  unique=True,
-                  nullable=False,
-                  index=True)
+                  default=_UuidPool.next_uuid_str,
+                  nullable=False)
 
     created_at = db.Column(db.DateTime(timezone=True),
                           server_default=func.now(),
@@ -59,7 +153,9 @@ class BaseModel(db.Model):
                           onupdate=func.now(),
                           nullable=False)
 
-    is_deleted = db.Column(db.Boolean, default=False, nullable=False, index=True)
+    # Indexed together with created_at (see _add_soft_delete_index); a
+    # boolean index on its own is too unselective to be used
+    is_deleted = db.Column(db.Boolean, default=False, nullable=False)
     deleted_at = db.Column(db.DateTime(timezone=True), nullable=True)
 
     @classmethod
@@ -78,23 +174,22 @@ class BaseModel(db.Model):
             db.session.commit()
         except Exception as e:
             db.session.rollback()
-            logger.error(f"Transaction failed: {str(e)}")
+            logger.error("Transaction failed: %s", e)
             raise
 
     def __init__(self, **kwargs: Dict[str, Any]) -> None:
         """Initialize a new model instance with validation."""
         self.validate_init_data(kwargs)
 
-        super().__init__(**kwargs)
-
-        if not self.id:
-            self.id = str(uuid.uuid4())
+        if not kwargs.get('id'):
+            kwargs['id'] = _UuidPool.next_uuid_str()
 
-        now = datetime.now(UTC)
-        if not self.created_at:
-            self.created_at = now
-        if not self.updated_at:
-            self.updated_at = now
+        # Fields were validated above, so assign them directly instead of
+        # going through the declarative constructor, which re-checks each
+        # key. Timestamps are left unset so the INSERT takes the column's
+        # server default; they read as None until the row is flushed.
+        for key, value in kwargs.items():
+            setattr(self, key, value)
 
     @classmethod
     def validate_init_data(cls, data: Dict[str, Any]) -> None:
@@ -106,17 +201,39 @@ class BaseModel(db.Model):
         Raises:
             AttributeError: If data contains invalid field names
         """
-        invalid_fields = [key for key in data if not hasattr(cls, key)]
+        valid_fields = cls._valid_fields()
+        invalid_fields = [key for key in data if key not in valid_fields]
         if invalid_fields:
             raise AttributeError(f"Invalid fields for {cls.__name__}: {', '.join(invalid_fields)}")
 
     @classmethod
-    def get_by_id(cls, id: str, include_deleted: bool = False) -> Optional['BaseModel']:
+    def _valid_fields(cls) -> frozenset:
+        """Return the mapped attribute names accepted by __init__ and update.
+
+        Built from the mapper on first use and cached per class, so field
+        checks are set lookups rather than hasattr calls through the
+        instrumented descriptors. Methods and other plain class attributes
+        are not accepted.
+        """
+        fields = cls.__dict__.get('_VALID_FIELDS')
+        if fields is None:
+            fields = frozenset(inspect(cls).attrs.keys())
+            cls._VALID_FIELDS = fields
+        return fields
+
+    @classmethod
+    def get_by_id(cls, id: str, include_deleted: bool = False,
+                  populate_existing: bool = False) -> Optional['BaseModel']:
         """Retrieve a model instance by its ID.
 
+        Instances already loaded in the session are returned from the
+        identity map without a round trip to the database.
+
         Args:
             id: UUID string of the instance to retrieve
             include_deleted: Whether to include soft-deleted records
+            populate_existing: Re-read the row even if the instance is
+                already in the session, discarding unflushed changes
 
         Returns:
             Model instance if found, None otherwise
@@ -125,44 +242,94 @@ class BaseModel(db.Model):
             return None
 
         try:
-            query = cls.query
-            if not include_deleted:
-                query = query.filter_by(is_deleted=False)
-            return query.filter_by(id=id).first()
+            obj = db.session.get(cls, id, populate_existing=populate_existing)
+            if obj is None or (obj.is_deleted and not include_deleted):
+                return None
+            return obj
         except SQLAlchemyError as e:
-            logger.error(f"Error retrieving {cls.__name__} with id {id}: {str(e)}")
+            logger.error("Error retrieving %s with id %s: %s", cls.__name__, id, e)
             db.session.rollback()
             return None
 
     @classmethod
-    def bulk_create(cls: Type[T], items: List[Dict[str, Any]]) -> List[T]:
-        """Create multiple model instances in a single transaction.
+    def get_by_ids(cls, ids, include_deleted: bool = False,
+                   columns: Optional[tuple] = None) -> Dict[str, 'BaseModel']:
+        """Retrieve several model instances with a single IN query.
+
+        Args:
+            ids: Iterable of UUID strings to retrieve
+            include_deleted: Whether to include soft-deleted records
+            columns: Optional tuple of mapped attributes to load; the
+                remaining columns are deferred until first accessed
+
+        Returns:
+            Dict mapping each found id to its instance; missing ids are absent
+        """
+        ids = list({id for id in ids if id})
+        if not ids:
+            return {}
+
+        try:
+            # lambda_stmt caches the statement per call site and class, so
+            # repeat calls only bind the ids instead of rebuilding the query
+            # and computing its cache key
+            stmt = lambda_stmt(lambda: select(cls).where(cls.id.in_(ids)))
+            if not include_deleted:
+                stmt += lambda s: s.where(cls.is_deleted.is_(False))
+            if columns:
+                stmt += lambda s: s.options(load_only(*columns))
+            return {obj.id: obj for obj in db.session.scalars(stmt)}
+        except SQLAlchemyError as e:
+            logger.error("Error retrieving %s records: %s", cls.__name__, e)
+            db.session.rollback()
+            return {}
+
+    @classmethod
+    def bulk_create(cls, items: List[Dict[str, Any]]) -> List[str]:
+        """Create multiple records with multi-row INSERTs.
+
+        Rows are inserted through SQLAlchemy Core, skipping per-instance
+        unit-of-work bookkeeping, in statements of BULK_INSERT_CHUNK rows
+        within one transaction. Model validation hooks are not run.
 
         Args:
             items: List of dictionaries containing instance data
 
         Returns:
-            List of created model instances
+            List of ids of the created records, in input order
 
         Raises:
+            AttributeError: If an item contains invalid field names
             SQLAlchemyError: If bulk creation fails
         """
-        instances = []
+        rows = []
+        for item in items:
+            cls.validate_init_data(item)
+            row = dict(item)
+            # Same rule as __init__: a missing or empty id gets a new one
+            if not row.get('id'):
+                row['id'] = _UuidPool.next_uuid_str()
+            rows.append(row)
+
+        if not rows:
+            return []
+
         try:
+            chunk = cls.BULK_INSERT_CHUNK
             with cls.transaction():
-                for item in items:
-                    instance = cls(**item)
-                    db.session.add(instance)
-                    instances.append(instance)
-            return instances
+                for start in range(0, len(rows), chunk):
+                    db.session.execute(insert(cls), rows[start:start + chunk])
+            return [row['id'] for row in rows]
         except SQLAlchemyError as e:
-            logger.error(f"Bulk create failed for {cls.__name__}: {str(e)}")
+            logger.error("Bulk create failed for %s: %s", cls.__name__, e)
             raise
 
     def save(self, commit: bool = True) -> bool:
         """Save the current instance to the database.
 
-        Implements retry logic for handling transient database errors.
+        Retries with exponential backoff on transient errors (deadlocks,
+        lock wait timeouts, dropped connections). Other database errors
+        are deterministic and are raised on the first attempt.
 
         Args:
             commit: Whether to commit the transaction immediately
@@ -180,30 +347,39 @@ class BaseModel(db.Model):
         while retry_count < MAX_RETRIES:
             try:
                 if not self.id:
-                    self.id = str(uuid.uuid4())
+                    self.id = _UuidPool.next_uuid_str()
 
-                self.updated_at = datetime.now(UTC)
                 if self not in db.session:
                     db.session.add(self)
 
+                # No refresh after commit: expired attributes, including
+                # server-default timestamps, reload lazily on access
                 if commit:
                     db.session.commit()
-                    db.session.refresh(self)
                 return True
 
             except IntegrityError as e:
                 db.session.rollback()
-                logger.error(f"Integrity error saving {self.__class__.__name__}: {str(e)}")
+                logger.error("Integrity error saving %s: %s", self.__class__.__name__, e)
                 raise
 
-            except SQLAlchemyError as e:
-                retry_count += 1
+            except DBAPIError as e:
                 db.session.rollback()
+                if not _is_retryable(e):
+                    logger.error("Error saving %s: %s", self.__class__.__name__, e)
+                    raise
 
+                retry_count += 1
                 if retry_count == MAX_RETRIES:
-                    err = f"Failed to save {self.__class__.__name__} after {MAX_RETRIES} attempts: {str(e)}"
-                    logger.error(err)
+                    logger.error("Failed to save %s after %d attempts: %s",
+                                 self.__class__.__name__, MAX_RETRIES, e)
                     raise
+                time.sleep(SAVE_RETRY_BACKOFF * 2 ** retry_count)
+
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                logger.error("Error saving %s: %s", self.__class__.__name__, e)
+                raise
 
         return False
 
@@ -220,8 +396,8 @@ class BaseModel(db.Model):
                 self.save()
             return True
         except SQLAlchemyError as e:
-            err = f"Error soft deleting {self.__class__.__name__} {self.id}: {str(e)}"
-            logger.error(err)
+            logger.error("Error soft deleting %s %s: %s",
+                         self.__class__.__name__, self.id, e)
             return False
 
     def hard_delete(self) -> bool:
@@ -231,8 +407,8 @@ class BaseModel(db.Model):
                 db.session.delete(self)
             return True
         except SQLAlchemyError as e:
-            err = f"Error deleting {self.__class__.__name__} {self.id}: {str(e)}"
-            logger.error(err)
+            logger.error("Error deleting %s %s: %s",
+                         self.__class__.__name__, self.id, e)
             raise
 
     def update(self, **kwargs: Dict[str, Any]) -> bool:
@@ -240,7 +416,8 @@ class BaseModel(db.Model):
         try:
             with self.transaction():
                 # Validate fields
-                invalid_fields = [key for key in kwargs if not hasattr(self, key)]
+                valid_fields = self._valid_fields()
+                invalid_fields = [key for key in kwargs if key not in valid_fields]
                 if invalid_fields:
                     raise AttributeError(f"Invalid fields: {', '.join(invalid_fields)}")
 
@@ -249,7 +426,6 @@ class BaseModel(db.Model):
                     setattr(self, key, value)
 
                 self.validate()
-                self.updated_at = datetime.now(UTC)
 
                 if self not in db.session:
                     db.session.add(self)
@@ -257,24 +433,52 @@ class BaseModel(db.Model):
             return True
 
         except SQLAlchemyError as e:
-            logger.error(f"Error updating {self.__class__.__name__} {self.id}: {str(e)}")
+            logger.error("Error updating %s %s: %s", self.__class__.__name__, self.id, e)
             db.session.rollback()
             return False
 
-    def to_dict(self, exclude: set = None) -> Dict[str, Any]:
-        """Convert record to dictionary with sensitive field exclusion."""
-        if exclude is None:
-            exclude = set()
+    @classmethod
+    def _serialize_plan(cls) -> tuple:
+        """Return the (column name, converter) pairs used by to_dict.
 
-        exclude.update({'password_hash', 'password'})
+        Built from the table definition on first use and cached per class,
+        so serialization does not inspect column values' types per call.
+        SENSITIVE_FIELDS are left out of the plan entirely.
+        """
+        plan = cls.__dict__.get('_SERIALIZE_PLAN')
+        if plan is None:
+            plan = tuple(
+                (column.name, _CONVERTERS.get(type(column.type)))
+                for column in cls.__table__.columns
+                if column.name not in cls.SENSITIVE_FIELDS
+            )
+            cls._SERIALIZE_PLAN = plan
+        return plan
 
+    def to_dict(self, exclude: set = None) -> Dict[str, Any]:
+        """Convert record to dictionary with sensitive field exclusion."""
+        # Loaded column values live in the instance __dict__; reading them
+        # there skips the instrumented descriptor. Expired or unloaded
+        # columns fall back to getattr so they are loaded as usual.
+        state = self.__dict__
         data = {}
-        for column in self.__table__.columns:
-            if column.name not in exclude:
-                value = getattr(self, column.name)
-                if isinstance(value, datetime):
-                    value = value.isoformat()
-                elif isinstance(value, uuid.UUID):
-                    value = str(value)
-                data[column.name] = value
+        for name, convert in self._serialize_plan():
+            if exclude and name in exclude:
+                continue
+            value = state[name] if name in state else getattr(self, name)
+            if convert is not None and value is not None:
+                value = convert(value)
+            data[name] = value
         return data
+
+
+@event.listens_for(BaseModel, 'instrument_class', propagate=True)
+def _add_soft_delete_index(mapper, class_) -> None:
+    """Index live rows by creation time on every model table.
+
+    Attached here rather than in __table_args__ because subclasses define
+    their own __table_args__, which would replace a base-class one.
+    """
+    table = mapper.local_table
+    db.Index(f'idx_{table.name}_active_created',
+             table.c.is_deleted, table.c.created_at)
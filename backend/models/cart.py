@@ -7,18 +7,42 @@ methods for adding, removing, and modifying cart items while maintaining
 data integrity and proper error handling.
 """
 import logging
-from app import db
-from datetime import datetime, UTC
-from models.base_model import BaseModel
+import orjson
+from extensions import db
+from flask import g, has_request_context
+from models.base_model import BaseModel, ID_TYPE
 from models.menu_item import MenuItem
 from sqlalchemy import ForeignKey
+from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.orm import relationship
 from sqlalchemy.exc import SQLAlchemyError
-from typing import Optional, Dict, Any, List
+from sqlalchemy.sql import func
+from typing import Optional, Dict, Any, List, Tuple
 
 logger = logging.getLogger(__name__)
 
 
+def _get_menu_items(ids, columns: Optional[tuple] = None) -> Dict[str, MenuItem]:
+    """Return menu items by id, reusing those already loaded in this request.
+
+    Items are kept on flask.g, so the cache lives exactly as long as the
+    request's app context. A request for full rows (no columns) refetches
+    items that were only partially loaded. Outside a request every call
+    goes to the database.
+    """
+    if not has_request_context():
+        return MenuItem.get_by_ids(ids, columns=columns)
+
+    cache = g.setdefault('_menu_items', {})  # id -> (item, fully loaded)
+    wanted = set(ids)
+    missing = [item_id for item_id in wanted
+               if item_id not in cache or (columns is None and not cache[item_id][1])]
+    if missing:
+        for item_id, item in MenuItem.get_by_ids(missing, columns=columns).items():
+            cache[item_id] = (item, columns is None)
+    return {item_id: cache[item_id][0] for item_id in wanted if item_id in cache}
+
+
 class Cart(BaseModel):
     """Shopping cart model for managing user selections.
 
@@ -37,31 +61,37 @@ class Cart(BaseModel):
     __tablename__ = "carts"
     __table_args__ = (
         db.Index('idx_cart_user', 'user_id'),
-        {'extend_existing': True}
     )
 
     MAX_ITEMS_PER_PRODUCT = 99
     MIN_QUANTITY = 1
 
+    # Menu item columns needed to validate and price cart lines
+    PRICING_COLUMNS = (MenuItem.price, MenuItem.is_available, MenuItem.toppings)
+
     user_id = db.Column(
-        db.String(40),
+        ID_TYPE,
         ForeignKey('users.id', ondelete='CASCADE'),
-        nullable=False,
-        index=True
+        nullable=False
     )
-    items = db.Column(db.JSON, default=dict, nullable=False)
+    # MutableDict flags the cart dirty when a line is set or deleted, so
+    # in-place edits are flushed and untouched carts are not rewritten.
+    # It does not see changes inside a line; replace the line dict instead.
+    items = db.Column(MutableDict.as_mutable(db.JSON), default=dict, nullable=False)
     total_price = db.Column(db.Float, default=0.0, nullable=False)
     last_modified = db.Column(
         db.DateTime(timezone=True),
-        default=lambda: datetime.now(UTC),
-        onupdate=lambda: datetime.now(UTC),
+        server_default=func.now(),
+        onupdate=func.now(),
         nullable=False
     )
 
+    # Cart reads and writes never need the owner, so it is not joined in.
+    # Code that does must load it explicitly, e.g. with selectinload.
     user = relationship(
         "User",
         backref=db.backref("cart", uselist=False, cascade="all, delete-orphan"),
-        lazy='joined'
+        lazy='raise_on_sql'
     )
 
     def __init__(self, **kwargs):
@@ -90,6 +120,9 @@ class Cart(BaseModel):
         if self.total_price < 0:
             raise ValueError("Total price cannot be negative")
 
+        menu_items = _get_menu_items(self.items, columns=self.PRICING_COLUMNS)
+        # Bounds read once as locals rather than per line from the class
+        min_quantity, max_quantity = self.MIN_QUANTITY, self.MAX_ITEMS_PER_PRODUCT
         for item_id, details in self.items.items():
             if not isinstance(details, dict):
                 raise ValueError(f"Invalid item structure for item {item_id}")
@@ -101,14 +134,14 @@ class Cart(BaseModel):
             if not isinstance(quantity, int):
                 raise ValueError(f"Quantity must be an integer for item {item_id}")
 
-            if not self.MIN_QUANTITY <= quantity <= self.MAX_ITEMS_PER_PRODUCT:
+            if not min_quantity <= quantity <= max_quantity:
                 raise ValueError(
-                    f"Quantity must be between {self.MIN_QUANTITY} and "
-                    f"{self.MAX_ITEMS_PER_PRODUCT} for item {item_id}"
+                    f"Quantity must be between {min_quantity} and "
+                    f"{max_quantity} for item {item_id}"
                 )
 
             # Verify item exists and is available
-            menu_item = MenuItem.get_by_id(item_id)
+            menu_item = menu_items.get(item_id)
             if not menu_item:
                 raise ValueError(f"Menu item {item_id} not found")
             if not menu_item.is_available:
@@ -127,35 +160,108 @@ class Cart(BaseModel):
             ValueError: If item not found, unavailable, or quantity invalid
             SQLAlchemyError: If database operation fails
         """
-        try:
-            menu_item = MenuItem.get_by_id(menu_item_id)
-            if not menu_item:
-                raise ValueError("Menu item not found")
-            if not menu_item.is_available:
-                raise ValueError("Menu item is not available")
-            if not self.MIN_QUANTITY <= quantity <= self.MAX_ITEMS_PER_PRODUCT:
+        self.add_items([(menu_item_id, quantity, selected_toppings)])
+
+    def add_items(self, entries: List[Tuple[str, int, Optional[List[str]]]]) -> None:
+        """Add several items to the cart with one lookup and one save.
+
+        Entries are validated together before the cart is changed, so
+        either all of them are added or none are. Repeated ids accumulate
+        their quantities and keep the last entry's toppings.
+
+        Args:
+            entries: (menu_item_id, quantity, selected_toppings) tuples
+
+        Raises:
+            ValueError: If an item is not found, unavailable, or a quantity
+                is invalid
+            SQLAlchemyError: If database operation fails
+        """
+        # Only the lower bound is checked here: a non-positive quantity would
+        # read as a removal below. The upper bound applies to the resulting
+        # line and is checked once in bulk_update.
+        for _, quantity, _ in entries:
+            if quantity < self.MIN_QUANTITY:
                 raise ValueError(
                     f"Quantity must be between {self.MIN_QUANTITY} and "
                     f"{self.MAX_ITEMS_PER_PRODUCT}"
                 )
 
-            with self.transaction():
-                current_quantity = self.items.get(menu_item_id, {}).get("quantity", 0)
-                new_quantity = current_quantity + quantity
+        self.bulk_update([
+            (menu_item_id, quantity, selected_toppings or [])
+            for menu_item_id, quantity, selected_toppings in entries
+        ])
 
-                if new_quantity > self.MAX_ITEMS_PER_PRODUCT:
-                    raise ValueError(f"Cannot exceed {self.MAX_ITEMS_PER_PRODUCT} items per product")
+    def bulk_update(self, changes: List[Tuple[str, int, Optional[List[str]]]]) -> None:
+        """Apply several quantity changes with one lookup and one save.
 
-                self.items[menu_item_id] = {
-                    "quantity": new_quantity,
-                    "toppings": selected_toppings or []
-                }
+        A positive delta adds to a line, creating it if needed; a negative
+        delta reduces it, and a line that reaches zero is removed. Changes
+        are validated together before the cart is modified, so either all
+        of them apply or none do.
 
-                self._update_total()
+        Args:
+            changes: (menu_item_id, delta, toppings) tuples; toppings of
+                None keep the line's current toppings
+
+        Raises:
+            ValueError: If an added item is not found or unavailable, a
+                reduced item is not in the cart, or a line would exceed
+                MAX_ITEMS_PER_PRODUCT
+            SQLAlchemyError: If database operation fails
+        """
+        try:
+            # One query covers the added items and everything already in
+            # the cart, so the total below needs no further lookups
+            menu_items = _get_menu_items(
+                [*(change[0] for change in changes if change[1] > 0), *self.items],
+                columns=self.PRICING_COLUMNS)
+
+            max_quantity = self.MAX_ITEMS_PER_PRODUCT
+            lines = {}  # menu item id -> new line, or None to remove it
+            for menu_item_id, delta, toppings in changes:
+                if menu_item_id in lines:
+                    current = lines[menu_item_id]
+                else:
+                    current = self.items.get(menu_item_id)
+
+                if delta > 0:
+                    menu_item = menu_items.get(menu_item_id)
+                    if not menu_item:
+                        raise ValueError("Menu item not found")
+                    if not menu_item.is_available:
+                        raise ValueError("Menu item is not available")
+                elif current is None:
+                    raise ValueError("Item not in cart")
+
+                new_quantity = (current["quantity"] if current else 0) + delta
+                if new_quantity > max_quantity:
+                    raise ValueError(f"Cannot exceed {max_quantity} items per product")
+
+                if new_quantity <= 0:
+                    lines[menu_item_id] = None
+                else:
+                    if toppings is None:
+                        toppings = current["toppings"] if current else []
+                    lines[menu_item_id] = {
+                        "quantity": new_quantity,
+                        "toppings": toppings
+                    }
+
+            if not lines:
+                return
+
+            with self.transaction():
+                for menu_item_id, line in lines.items():
+                    if line is None:
+                        self.items.pop(menu_item_id, None)
+                    else:
+                        self.items[menu_item_id] = line
+                self._update_total(menu_items)
                 self.save()
 
         except SQLAlchemyError as e:
-            logger.error(f"Error adding item to cart: {str(e)}")
+            logger.error("Error updating cart items: %s", e)
             raise
 
     def remove_item(self, menu_item_id: str, quantity: Optional[int] = None) -> None:
@@ -181,7 +287,10 @@ class Cart(BaseModel):
                 else:
                     if quantity < 1:
                         raise ValueError("Quantity to remove must be positive")
-                    self.items[menu_item_id]["quantity"] -= quantity
+                    self.items[menu_item_id] = {
+                        **self.items[menu_item_id],
+                        "quantity": current_quantity - quantity
+                    }
 
                 self._update_total()
                 self.save()
@@ -212,7 +321,10 @@ class Cart(BaseModel):
                 )
 
             with self.transaction():
-                self.items[menu_item_id]["quantity"] = quantity
+                self.items[menu_item_id] = {
+                    **self.items[menu_item_id],
+                    "quantity": quantity
+                }
                 self._update_total()
                 self.save()
 
@@ -220,32 +332,37 @@ class Cart(BaseModel):
             logger.error(f"Error updating item quantity: {str(e)}")
             raise
 
-    def _update_total(self) -> None:
+    def _update_total(self, menu_items: Optional[Dict[str, MenuItem]] = None) -> None:
         """Update the total price of the cart based on current items.
 
         Includes calculations for both base prices and selected toppings.
+
+        Args:
+            menu_items: Menu items already loaded for this cart, by id;
+                fetched in a single query when not given
         """
         total = 0.0
         try:
+            if menu_items is None:
+                menu_items = _get_menu_items(self.items,
+                                             columns=self.PRICING_COLUMNS)
             for item_id, details in self.items.items():
-                menu_item = MenuItem.get_by_id(item_id)
+                menu_item = menu_items.get(item_id)
                 if menu_item and menu_item.is_available:
                     item_price = menu_item.price
                     quantity = details["quantity"]
 
                     # Calculate topping prices
                     if details.get("toppings"):
-                        topping_price = sum(
-                            t.get("price", 0)
-                            for t in menu_item.toppings
-                            if t.get("name") in details["toppings"]
+                        topping_prices = menu_item.topping_prices
+                        item_price += sum(
+                            topping_prices.get(name, 0)
+                            for name in details["toppings"]
                         )
-                        item_price += topping_price
 
                     total += item_price * quantity
 
             self.total_price = round(total, 2)
-            self.last_modified = datetime.now(UTC)
 
         except Exception as e:
             logger.error(f"Error calculating cart total: {str(e)}")
@@ -261,7 +378,6 @@ class Cart(BaseModel):
             with self.transaction():
                 self.items = {}
                 self.total_price = 0.0
-                self.last_modified = datetime.now(UTC)
                 self.save()
 
         except SQLAlchemyError as e:
@@ -283,22 +399,31 @@ class Cart(BaseModel):
         data = super().to_dict(exclude)
 
         # Add detailed items information
+        # items is a non-null MutableDict column; validate() guards its type
         items_detail = {}
-        if isinstance(self.items, dict):
-            for item_id, details in self.items.items():
-                menu_item = MenuItem.get_by_id(item_id)
-                if menu_item:
-                    items_detail[item_id] = {
-                        **details,
-                        "item": menu_item.to_dict(),
-                        "subtotal": round(
-                            menu_item.price * details["quantity"], 2
-                        )
-                    }
+        menu_items = _get_menu_items(self.items)
+        for item_id, details in self.items.items():
+            menu_item = menu_items.get(item_id)
+            if menu_item:
+                entry = details.copy()
+                entry["item"] = menu_item.to_dict()
+                entry["subtotal"] = round(
+                    menu_item.price * details["quantity"], 2
+                )
+                items_detail[item_id] = entry
 
         data['items'] = items_detail
         return data
 
+    def to_json(self) -> bytes:
+        """Serialize the cart, as returned by to_dict, to JSON bytes.
+
+        Encoded with orjson, so views can send the body directly with
+        Response(cart.to_json(), mimetype='application/json') instead of
+        going through jsonify and the stdlib encoder.
+        """
+        return orjson.dumps(self.to_dict())
+
     def __repr__(self) -> str:
         """Provide a string representation of the Cart object."""
         return f'<Cart {self.id} owned by User {self.user_id}>'
@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 """Defines MenuItem model with admin operations"""
-from app import db
+import logging
+from extensions import db
 from flask_login import current_user
+from itertools import groupby
 from models.base_model import BaseModel
+from operator import attrgetter
+from sqlalchemy import event, lambda_stmt, select
 from sqlalchemy.exc import SQLAlchemyError
 from typing import Optional, Any, Dict, List
 
+logger = logging.getLogger(__name__)
+
 
 class MenuItem(BaseModel):
     """Restaurant menu item model with full item details.
@@ -28,6 +34,12 @@ class MenuItem(BaseModel):
     """
 
     __tablename__ = "menu_items"
+    # Covers get_by_category's filters; also serves lookups by category
+    # alone, so category carries no separate index
+    __table_args__ = (
+        db.Index('idx_menu_category_available',
+                 'category', 'is_available', 'is_deleted'),
+    )
 
     MIN_PRICE = 0.01
     MAX_PRICE = 10000.00
@@ -38,7 +50,7 @@ class MenuItem(BaseModel):
     image_url = db.Column(db.String(255))
     is_available = db.Column(db.Boolean, default=True, nullable=False)
     toppings = db.Column(db.JSON, default=list)
-    category = db.Column(db.String(50), nullable=False, index=True)
+    category = db.Column(db.String(50), nullable=False)
     preparation_time = db.Column(db.Integer)  # in minutes
     calories = db.Column(db.Integer)
     allergens = db.Column(db.JSON, default=list)
@@ -83,6 +95,24 @@ class MenuItem(BaseModel):
             if topping['price'] < 0:
                 raise ValueError("Topping price cannot be negative")
 
+    @property
+    def topping_prices(self) -> Dict[str, float]:
+        """Map of topping name to price for this item.
+
+        Built once per toppings value and kept on the instance, so pricing
+        a cart line is a dict lookup per selected topping instead of a scan
+        of every topping. Assigning or reloading toppings yields a new list
+        and the map is rebuilt on next access.
+        """
+        toppings = self.toppings
+        cached = self.__dict__.get('_topping_prices')
+        if cached is None or cached[0] is not toppings:
+            prices = {t.get('name'): t.get('price', 0)
+                      for t in toppings or () if isinstance(t, dict)}
+            cached = (toppings, prices)
+            self.__dict__['_topping_prices'] = cached
+        return cached[1]
+
     @classmethod
     def create_menu_item(cls, **kwargs) -> 'MenuItem':
         """
@@ -146,16 +176,42 @@ class MenuItem(BaseModel):
 
     @classmethod
     def get_by_category(cls, category: str, include_unavailable: bool = False) -> List['MenuItem']:
-        """Get menu items by category."""
+        """Get menu items by category.
+
+        The statement is built with lambda_stmt, so it is constructed and
+        compiled once per variant and later calls only bind the category.
+        """
         try:
-            query = cls.query.filter_by(is_deleted=False)
+            stmt = lambda_stmt(lambda: select(cls).where(
+                cls.category == category, cls.is_deleted.is_(False)))
             if not include_unavailable:
-                query = query.filter_by(is_available=True)
-            return query.filter_by(category=category).all()
+                stmt += lambda s: s.where(cls.is_available.is_(True))
+            return list(db.session.scalars(stmt))
         except SQLAlchemyError as e:
-            logger.error(f"Error retrieving menu items by category: {str(e)}")
+            logger.error("Error retrieving menu items by category: %s", e)
             return []
 
+    @classmethod
+    def get_menu_items(cls, include_unavailable: bool = False) -> Dict[str, List['MenuItem']]:
+        """Get the whole menu grouped by category.
+
+        Loads every item in one query ordered by category and groups the
+        rows in Python, rather than querying once per category.
+        """
+        try:
+            stmt = lambda_stmt(lambda: select(cls).where(
+                cls.is_deleted.is_(False)).order_by(cls.category, cls.name))
+            if not include_unavailable:
+                stmt += lambda s: s.where(cls.is_available.is_(True))
+            return {
+                category: list(items)
+                for category, items in groupby(db.session.scalars(stmt),
+                                               key=attrgetter('category'))
+            }
+        except SQLAlchemyError as e:
+            logger.error("Error retrieving menu items: %s", e)
+            return {}
+
     @classmethod
     def delete_menu_item(cls, item_id):
         """
@@ -182,10 +238,24 @@ class MenuItem(BaseModel):
             raise ValueError(f"Error deleting menu item: {str(e)}")
 
     def to_dict(self, exclude: set = None) -> Dict[str, Any]:
-        """Convert the menu item to a dictionary"""
-        if exclude is None:
-            exclude = set()
+        """Convert the menu item to a dictionary.
+
+        The full dictionary is built once and kept on the instance until a
+        column is assigned, expired or reloaded (see _drop_cached_dict), so
+        a menu item serialized for many cart lines is converted only once.
+        Callers get a shallow copy; nested lists such as toppings are shared.
+        """
+        if exclude:
+            return self._build_dict(exclude)
 
+        cached = self.__dict__.get('_cached_dict')
+        if cached is None:
+            cached = self._build_dict()
+            self.__dict__['_cached_dict'] = cached
+        return cached.copy()
+
+    def _build_dict(self, exclude: set = None) -> Dict[str, Any]:
+        """Serialize the menu item's columns"""
         data = super().to_dict(exclude)
 
         # Add computed fields if needed
@@ -196,3 +266,14 @@ class MenuItem(BaseModel):
     def __repr__(self) -> str:
         """Provide a string representation of the MenuItem object."""
         return f'<MenuItem {self.name} (ID: {self.id})>'
+
+
+def _drop_cached_dict(target, *args) -> None:
+    """Forget a menu item's cached to_dict result once its state changes"""
+    target.__dict__.pop('_cached_dict', None)
+
+
+for _column in MenuItem.__table__.columns:
+    event.listen(getattr(MenuItem, _column.key), 'set', _drop_cached_dict)
+for _event in ('expire', 'refresh', 'refresh_flush'):
+    event.listen(MenuItem, _event, _drop_cached_dict)
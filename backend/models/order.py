@@ -1,14 +1,18 @@
 #!usr/bin/env python3
 """Defines an Order model"""
+import logging
 import uuid
-from app import db
-from datetime import datetime, timezone, UTC
-from models.base_model import BaseModel
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from extensions import db
+from models.base_model import BaseModel, ID_TYPE
+from models.menu_item import MenuItem
+from sqlalchemy import bindparam, lambda_stmt, select, text, update
+from sqlalchemy.orm import defer, raiseload, relationship
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.sql import func
-from time import sleep
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
 
 
 class Order(BaseModel):
@@ -25,13 +29,17 @@ class Order(BaseModel):
         status: Current order status (pending, confirmed, etc.)
         notes: Additional order notes
         delivery_address: Delivery location
+        unit_prices: Unit price of each line, recorded by snapshot_prices
         user: Relationship to the ordering user
     """
 
     __tablename__ = "orders"
+    # Both match get_user_orders: equality columns first, then date, so
+    # the newest-first listing reads the index in order without a sort
     __table_args__ = (
-        db.Index('idx_order_user_status', 'user_id', 'status'),
-        {'extend_existing': True}
+        db.Index('idx_order_user_date', 'user_id', 'is_deleted', 'date'),
+        db.Index('idx_order_user_status',
+                 'user_id', 'status', 'is_deleted', 'date'),
     )
 
     class Status:
@@ -49,19 +57,18 @@ class Order(BaseModel):
                 cls.READY, cls.DELIVERED, cls.CANCELLED
             ]
 
+    VALID_STATUSES = frozenset(Status.values())
+
     VALID_TRANSITIONS = {
-        Status.PENDING: [Status.CONFIRMED, Status.CANCELLED],
-        Status.CONFIRMED: [Status.PREPARING, Status.CANCELLED],
-        Status.PREPARING: [Status.READY, Status.CANCELLED],
-        Status.READY: [Status.DELIVERED, Status.CANCELLED],
-        Status.DELIVERED: [],
-        Status.CANCELLED: []
+        Status.PENDING: frozenset({Status.CONFIRMED, Status.CANCELLED}),
+        Status.CONFIRMED: frozenset({Status.PREPARING, Status.CANCELLED}),
+        Status.PREPARING: frozenset({Status.READY, Status.CANCELLED}),
+        Status.READY: frozenset({Status.DELIVERED, Status.CANCELLED}),
+        Status.DELIVERED: frozenset(),
+        Status.CANCELLED: frozenset()
     }
 
-    MAX_RETRIES = 3
-    RETRY_DELAY = 0.3
-
-    user_id = db.Column(db.String(40),
+    user_id = db.Column(ID_TYPE,
                         db.ForeignKey('users.id', ondelete='CASCADE'),
                         nullable=False)
     items = db.Column(db.JSON, default={}, nullable=False)
@@ -72,19 +79,22 @@ class Order(BaseModel):
     status = db.Column(db.String(20), nullable=False)
     notes = db.Column(db.Text)
     delivery_address = db.Column(db.String(255))
+    # Kept apart from items, which callers build from request data, so a
+    # price can only come from the menu
+    unit_prices = db.Column(db.JSON)
 
+    # Loaded on first access only; list views that show the user should
+    # add selectinload(Order.user) to fetch all owners in one query
     user = db.relationship(
             "User",
             back_populates="orders",
-            lazy='joined'
+            lazy='select'
     )
 
     def __init__(self, **kwargs):
         """Initialize order with default status."""
         if 'status' not in kwargs:
             kwargs['status'] = self.Status.PENDING
-        if 'date' not in kwargs:
-            kwargs['date'] = datetime.now(UTC)
         super().__init__(**kwargs)
 
     def validate(self):
@@ -105,7 +115,7 @@ class Order(BaseModel):
         if not self.items or not isinstance(self.items, dict):
             raise ValueError("Order must have valid items")
 
-        if self.status not in self.Status.values():
+        if self.status not in self.VALID_STATUSES:
             raise ValueError(f"Invalid status: {self.status}")
 
         # Validate items structure
@@ -116,6 +126,8 @@ class Order(BaseModel):
                 raise ValueError(f"Missing quantity for item {item_id}")
             if details['quantity'] <= 0:
                 raise ValueError(f"Invalid quantity for item {item_id}")
+            if 'unit_price' in details:
+                raise ValueError(f"Unit price cannot be set for item {item_id}")
 
     def can_transition_to(self, new_status: str) -> bool:
         """Check if a status transition is valid.
@@ -126,39 +138,134 @@ class Order(BaseModel):
         Returns:
             bool: Whether transition is allowed
         """
-        return new_status in self.VALID_TRANSITIONS.get(self.status, [])
+        return new_status in self.VALID_TRANSITIONS.get(self.status, ())
 
     def update_status(self, new_status: str) -> bool:
-        """Update order status with validation."""
+        """Update order status with validation.
+
+        Issued as a single UPDATE conditioned on the status this instance
+        last saw, so a transition made concurrently by another request is
+        detected by the database instead of being overwritten.
+
+        Returns:
+            bool: True if updated; False if the order's status changed
+                since it was loaded or the update failed
+        """
+        current_status = self.status
         if not self.can_transition_to(new_status):
             raise ValueError(
-                f"Invalid status transition from {self.status} to {new_status}"
+                f"Invalid status transition from {current_status} to {new_status}"
             )
 
         try:
             with self.transaction():
-                self.status = new_status
-                self.save()
+                result = db.session.execute(
+                    update(Order)
+                    .where(Order.id == self.id, Order.status == current_status)
+                    .values(status=new_status)
+                    .execution_options(synchronize_session=False)
+                )
+            if result.rowcount != 1:
+                logger.warning("Order %s is no longer %s; status not updated",
+                               self.id, current_status)
+                return False
             return True
         except SQLAlchemyError as e:
-            logger.error(f"Error updating order status: {str(e)}")
+            logger.error("Error updating order status: %s", e)
             return False
 
     @classmethod
-    def get_user_orders(cls, user_id: str, status: str = None) -> List['Order']:
-        """Get orders for a specific user with optional status filter."""
+    def get_user_orders(cls, user_id: str, status: str = None,
+                        summary: bool = False, limit: Optional[int] = None,
+                        offset: int = 0) -> List['Order']:
+        """Get orders for a specific user with optional status filter.
+
+        The returned orders have .user set to raise rather than query, since
+        the caller already knows the user. With summary=True the items,
+        notes and delivery_address columns are left out of the SELECT for
+        list views; each loads with its own query if accessed. limit and
+        offset page through long histories instead of loading them whole.
+        """
         try:
-            query = cls.query.filter_by(user_id=user_id, is_deleted=False)
+            # Cached lambda statements: repeat calls only bind the values
+            stmt = lambda_stmt(lambda: select(cls).where(
+                cls.user_id == user_id, cls.is_deleted.is_(False)))
             if status:
-                query = query.filter_by(status=status)
-            return query.order_by(cls.date.desc()).all()
+                stmt += lambda s: s.where(cls.status == status)
+            if summary:
+                stmt += lambda s: s.options(
+                    defer(cls.items), defer(cls.notes), defer(cls.delivery_address))
+            stmt += lambda s: s.options(raiseload(cls.user)).order_by(cls.date.desc())
+            if limit is not None:
+                stmt += lambda s: s.limit(limit).offset(offset)
+            # Read-only: nothing pending needs flushing before the SELECT
+            with db.session.no_autoflush:
+                return list(db.session.scalars(stmt))
+        except SQLAlchemyError as e:
+            logger.error("Error retrieving user orders: %s", e)
+            return []
+
+    # Per-dialect statements unpacking the items JSON object into one row
+    # per line, so quantities are summed and ranked by the database.
+    # MySQL lists the object's keys with JSON_KEYS and expands them with
+    # JSON_TABLE; SQLite (tests) expands the object with json_each.
+    _BEST_SELLERS_SQL = {
+        'mysql': """
+            SELECT jt.item_id AS item_id,
+                   SUM(JSON_EXTRACT(o.items,
+                       CONCAT('$."', jt.item_id, '".quantity'))) AS quantity
+            FROM orders AS o,
+                 JSON_TABLE(JSON_KEYS(o.items), '$[*]'
+                            COLUMNS (item_id VARCHAR(64) PATH '$')) AS jt
+            WHERE o.date >= :since AND o.is_deleted = false
+              AND o.status != :cancelled
+            GROUP BY jt.item_id
+            ORDER BY quantity DESC, item_id
+            LIMIT :limit
+        """,
+        'sqlite': """
+            SELECT je.key AS item_id,
+                   SUM(json_extract(je.value, '$.quantity')) AS quantity
+            FROM orders AS o, json_each(o.items) AS je
+            WHERE o.date >= :since AND o.is_deleted = 0
+              AND o.status != :cancelled
+            GROUP BY je.key
+            ORDER BY quantity DESC, item_id
+            LIMIT :limit
+        """,
+    }
+
+    @classmethod
+    def best_sellers(cls, since: datetime, limit: int = 5) -> List[Tuple[str, int]]:
+        """Get the most ordered menu items since a given date.
+
+        Lines are unpacked from the items JSON and summed in SQL, so only
+        the top `limit` rows reach the application. Cancelled orders are
+        not counted.
+
+        Returns:
+            (menu_item_id, quantity) pairs, highest quantity first
+        """
+        try:
+            dialect = db.session.get_bind().dialect.name
+            stmt = text(cls._BEST_SELLERS_SQL.get(dialect, cls._BEST_SELLERS_SQL['mysql']))
+            stmt = stmt.bindparams(bindparam('since', type_=cls.date.type))
+            rows = db.session.execute(stmt, {
+                'since': since,
+                'cancelled': cls.Status.CANCELLED,
+                'limit': limit,
+            })
+            return [(item_id, int(quantity or 0)) for item_id, quantity in rows]
         except SQLAlchemyError as e:
-            logger.error(f"Error retrieving user orders: {str(e)}")
+            logger.error("Error computing best sellers: %s", e)
             return []
 
     def calculate_total(self) -> float:
         """Calculate the total order amount including toppings.
 
+        Lines with a price in unit_prices, recorded by snapshot_prices, are
+        summed at that price; only other lines are priced from the menu.
+
         Returns:
             float: Calculated total rounded to 2 decimal places
 
@@ -166,36 +273,92 @@ class Order(BaseModel):
             ValueError: If menu items not found or quantities invalid
         """
         try:
+            recorded = self.unit_prices or {}
+            unpriced = [item_id for item_id in self.items
+                        if item_id not in recorded]
+            menu_prices = self._current_unit_prices(unpriced) if unpriced else {}
+
             total = 0.0
             for item_id, details in self.items.items():
-                menu_item = MenuItem.get_by_id(item_id)
-                if not menu_item:
-                    raise ValueError(f"Menu item {item_id} not found")
-
                 quantity = details.get('quantity', 0)
                 if quantity <= 0:
                     raise ValueError(f"Invalid quantity for item {item_id}")
 
-                item_total = menu_item.price * quantity
-
-                # Add topping prices if applicable
-                if details.get("toppings"):
-                    topping_price = sum(
-                        t.get("price", 0)
-                        for t in menu_item.toppings
-                        if t.get("name") in details["toppings"]
-                    )
-                    item_total += topping_price * quantity
-
-                total += item_total
+                unit_price = recorded.get(item_id)
+                if unit_price is None:
+                    unit_price = menu_prices[item_id]
+                total += unit_price * quantity
 
             return round(total, 2)
         except Exception as e:
             logger.error(f"Error calculating order total: {str(e)}")
             raise
 
+    def snapshot_prices(self) -> None:
+        """Record each line's current unit price and set the order total.
+
+        Call once when the order is placed. Every line is priced from the
+        menu, replacing any earlier snapshot. Stored prices keep an order's
+        total fixed when the menu changes later, and let calculate_total
+        run without reading menu items.
+
+        Raises:
+            ValueError: If menu items not found or quantities invalid
+        """
+        self.unit_prices = self._current_unit_prices(list(self.items))
+        self.total = self.calculate_total()
+
+    def _current_unit_prices(self, item_ids: List[str]) -> Dict[str, float]:
+        """Price one unit of each line, with its toppings, from the menu"""
+        # One query for every line instead of one per item
+        menu_items = MenuItem.get_by_ids(
+            item_ids, columns=(MenuItem.price, MenuItem.toppings))
+        missing = set(item_ids) - menu_items.keys()
+        if missing:
+            raise ValueError(f"Menu item {next(iter(missing))} not found")
+
+        unit_prices = {}
+        for item_id in item_ids:
+            menu_item = menu_items[item_id]
+            unit_price = menu_item.price
+
+            # Add topping prices if applicable
+            toppings = self.items[item_id].get("toppings")
+            if toppings:
+                topping_prices = menu_item.topping_prices
+                unit_price += sum(topping_prices.get(name, 0) for name in toppings)
+
+            unit_prices[item_id] = unit_price
+        return unit_prices
+
     def to_dict(self, exclude: set = None) -> Dict[str, Any]:
         """Enhanced dictionary conversion with detailed item information."""
+        menu_items = MenuItem.get_by_ids(
+            self.items if isinstance(self.items, dict) else ())
+        return self._to_dict_with(menu_items, exclude)
+
+    @classmethod
+    def serialize_many(cls, orders: List['Order'],
+                       exclude: set = None) -> List[Dict[str, Any]]:
+        """Serialize several orders with one menu item query for all of them.
+
+        Args:
+            orders: Orders to serialize, e.g. a user's order history
+            exclude: Set of fields to exclude from each dictionary
+
+        Returns:
+            List of dictionaries in the same order as orders
+        """
+        menu_items = MenuItem.get_by_ids({
+            item_id
+            for order in orders if isinstance(order.items, dict)
+            for item_id in order.items
+        })
+        return [order._to_dict_with(menu_items, exclude) for order in orders]
+
+    def _to_dict_with(self, menu_items: Dict[str, MenuItem],
+                      exclude: set = None) -> Dict[str, Any]:
+        """Build to_dict output from menu items that are already loaded"""
         if exclude is None:
             exclude = set()
 
@@ -205,7 +368,7 @@ class Order(BaseModel):
         items_detail = {}
         if isinstance(self.items, dict):
             for item_id, details in self.items.items():
-                menu_item = MenuItem.get_by_id(item_id)
+                menu_item = menu_items.get(item_id)
                 if menu_item:
                     items_detail[item_id] = {
                         **details,
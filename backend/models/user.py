@@ -1,15 +1,22 @@
 #!/usr/bin/env python3
 """Defines a user model"""
 import logging
+import os
 import re
-from app import db
-from extensions import bcrypt
-from datetime import datetime,  UTC
+from datetime import datetime, timedelta, UTC
+from extensions import db
 from models.base_model import BaseModel
 from models.order import Order
+from password_hasher import check_password, hash_password, needs_rehash
+from sqlalchemy import update
+from sqlalchemy.sql import func
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+MAX_LOGIN_ATTEMPTS = int(os.getenv('MAX_LOGIN_ATTEMPTS', 5))
+LOGIN_ATTEMPT_TIMEOUT = int(os.getenv('LOGIN_ATTEMPT_TIMEOUT', 15))  # minutes
+
 
 class User(BaseModel):
     """User account model with authentication and profile management.
@@ -25,6 +32,7 @@ class User(BaseModel):
         address: User's delivery address
         is_admin: Administrative privileges flag
         login_attempts: Failed login attempt counter
+        last_failed_login: Time of the most recent failed attempt
         last_login: Most recent login timestamp
         is_active: Account status flag
         orders: Relationship to user's orders
@@ -33,21 +41,23 @@ class User(BaseModel):
     __tablename__ = "users"
     __table_args__ = (
         db.Index('idx_user_email_username', 'email', 'username'),
-        {'extend_existing': True}
     )
 
-    USERNAME_REGEX = re.compile(r'^[a-zA-Z0-9_]{3,30}$')
-    EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
-    PHONE_REGEX = re.compile(r'^\+?1?\d{9,15}$')
+    # Applied with fullmatch, which anchors both ends
+    USERNAME_REGEX = re.compile(r'[a-zA-Z0-9_]{3,30}')
+    EMAIL_REGEX = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+    PHONE_REGEX = re.compile(r'\+?1?\d{9,15}')
+    EMAIL_MAX_LENGTH = 60
 
     username = db.Column(db.String(30), unique=True, nullable=False)
-    email = db.Column(db.String(60), unique=True, nullable=False)
+    email = db.Column(db.String(EMAIL_MAX_LENGTH), unique=True, nullable=False)
     phone_contact = db.Column(db.String(15))
     password_hash = db.Column(db.String(128), nullable=False)
     address = db.Column(db.String(100))
     is_admin = db.Column(db.Boolean, default=False)
     login_attempts = db.Column(db.Integer, default=0, nullable=False)
     last_login = db.Column(db.DateTime(timezone=True))
+    last_failed_login = db.Column(db.DateTime(timezone=True))
     is_active = db.Column(db.Boolean, default=True, nullable=False)
 
     orders = db.relationship(
@@ -69,13 +79,16 @@ class User(BaseModel):
         Raises:
             ValueError: If any validation check fails
         """
-        if not self.USERNAME_REGEX.match(self.username):
+        if not self.USERNAME_REGEX.fullmatch(self.username):
             raise ValueError("Invalid username format")
 
-        if not self.EMAIL_REGEX.match(self.email):
+        # Length is checked first so the regex never sees oversized input,
+        # which keeps its backtracking on crafted addresses bounded
+        if (len(self.email) > self.EMAIL_MAX_LENGTH
+                or not self.EMAIL_REGEX.fullmatch(self.email)):
             raise ValueError("Invalid email format")
 
-        if self.phone_contact and not self.PHONE_REGEX.match(self.phone_contact):
+        if self.phone_contact and not self.PHONE_REGEX.fullmatch(self.phone_contact):
             raise ValueError("Invalid phone number format")
 
         if not self.password_hash:
@@ -100,22 +113,23 @@ class User(BaseModel):
             if len(password) < 8:
                 raise ValueError("Password must be at least 8 characters long")
 
-            if not any(c.isupper() for c in password):
+            if not any(map(str.isupper, password)):
                 raise ValueError("Password must contain at least one uppercase letter")
 
-            if not any(c.islower() for c in password):
+            if not any(map(str.islower, password)):
                 raise ValueError("Password must contain at least one lowercase letter")
 
-            if not any(c.isdigit() for c in password):
+            if not any(map(str.isdigit, password)):
                 raise ValueError("Password must contain at least one number")
 
-        password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
-        self.password_hash = password_hash
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
         """Verify a password and handle login attempts.
 
-        Implements login attempt tracking and lockout after 5 failed attempts.
+        Implements login attempt tracking and lockout after
+        MAX_LOGIN_ATTEMPTS failed attempts. The lockout lifts once
+        LOGIN_ATTEMPT_TIMEOUT minutes pass without another failure.
 
         Args:
             password: Plain text password to verify
@@ -127,25 +141,64 @@ class User(BaseModel):
             if not password or not self.password_hash:
                 return False
 
-            if self.login_attempts and self.login_attempts >= 5:
-                logger.warning(f"Too many login attempts for user {self.id}")
+            window_open = self._failure_window_open()
+            if (window_open and self.login_attempts
+                    and self.login_attempts >= MAX_LOGIN_ATTEMPTS):
+                logger.warning("Too many login attempts for user %s", self.id)
                 return False
 
-            is_valid = bcrypt.check_password_hash(self.password_hash, password)
-
-            if not is_valid:
-                self.login_attempts += 1
-            else:
-                self.login_attempts = 0
-                self.last_login = datetime.now(UTC)
-                self.save()
-
+            is_valid = check_password(self.password_hash, password)
+            # Hashes made at a lower cost are upgraded on the user's next
+            # successful login instead of in a bulk migration
+            new_hash = None
+            if is_valid and needs_rehash(self.password_hash):
+                new_hash = hash_password(password)
+            self._record_login(is_valid, new_hash, restart_count=not window_open)
             return is_valid
 
         except Exception as e:
             logger.error(f"Error checking password: {str(e)}")
             return False
 
+    def _failure_window_open(self) -> bool:
+        """Check whether the last failed attempt is within the lockout window"""
+        last_failed = self.last_failed_login
+        if last_failed is None:
+            return False
+        if last_failed.tzinfo is None:
+            # SQLite and MySQL DATETIME columns hand back naive UTC values
+            last_failed = last_failed.replace(tzinfo=UTC)
+        return datetime.now(UTC) - last_failed < timedelta(minutes=LOGIN_ATTEMPT_TIMEOUT)
+
+    def _record_login(self, is_valid: bool, new_hash: Optional[str] = None,
+                      restart_count: bool = False) -> None:
+        """Store the outcome of a password check with a single UPDATE.
+
+        Failures increment the counter in SQL, so concurrent attempts are
+        all counted, and stamp last_failed_login; with restart_count the
+        counter starts again from 1, for a failure after an expired
+        window. A success clears the counter, stamps last_login with the
+        database clock and writes new_hash if one is given. The commit
+        expires the instance, so the columns reload on next access.
+        """
+        if is_valid:
+            values = {'login_attempts': 0, 'last_login': func.now()}
+            if new_hash:
+                values['password_hash'] = new_hash
+        else:
+            values = {
+                'login_attempts': 1 if restart_count else User.login_attempts + 1,
+                'last_failed_login': datetime.now(UTC),
+            }
+
+        with self.transaction():
+            db.session.execute(
+                update(User)
+                .where(User.id == self.id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+
     def reset_login_attempts(self) -> None:
         """Reset failed login attempts."""
         self.login_attempts = 0
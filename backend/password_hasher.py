@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Hashes and verifies passwords with the native bcrypt library"""
+import bcrypt
+from flask import current_app, has_app_context
+from functools import lru_cache
+
+DEFAULT_ROUNDS = 12
+
+
+def _rounds() -> int:
+    """Return the bcrypt cost configured for the current app"""
+    if has_app_context():
+        return current_app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_ROUNDS)
+    return DEFAULT_ROUNDS
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with bcrypt at the configured cost.
+
+    Hashes use the standard $2b$ format, so they verify the same way as
+    the ones previously produced through Flask-Bcrypt.
+
+    Raises:
+        ValueError: If password is empty
+    """
+    if not password:
+        raise ValueError('Password must be non-empty.')
+    salt = bcrypt.gensalt(rounds=_rounds())
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def check_password(password_hash: str, password: str) -> bool:
+    """Check a password against a stored bcrypt hash"""
+    if not password_hash or not password:
+        return False
+    return bcrypt.checkpw(password.encode('utf-8'),
+                          password_hash.encode('utf-8'))
+
+
+@lru_cache(maxsize=None)
+def _dummy_hash(rounds: int) -> str:
+    """Return a throwaway hash at the given cost, built once per cost"""
+    return bcrypt.hashpw(b'dummy-password', bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def check_dummy_password(password: str) -> bool:
+    """Spend the same bcrypt work as check_password for a missing account.
+
+    Lets a login for an unknown email take as long as a wrong password,
+    so response times do not reveal which emails are registered.
+
+    Returns:
+        bool: Always False
+    """
+    check_password(_dummy_hash(_rounds()), password)
+    return False
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """Check whether a bcrypt hash was made below the configured cost.
+
+    The cost is the two digits after the $2b$ prefix.
+    """
+    try:
+        return int(password_hash[4:6]) < _rounds()
+    except (TypeError, ValueError):
+        return False
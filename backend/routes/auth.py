@@ -3,34 +3,28 @@
 import jwt
 import logging
 import os
-from app import db, cache
+import threading
+import time
+from cache import cache
+from cachetools import TLRUCache
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
-from extensions import limiter
+from extensions import db, limiter
 from flask import Blueprint, request, jsonify, current_app
 from flask_cors import CORS
 from functools import wraps
-from logging.handlers import RotatingFileHandler
 from marshmallow import Schema, fields, validate, ValidationError
-from models.user import User
+from models.user import LOGIN_ATTEMPT_TIMEOUT, MAX_LOGIN_ATTEMPTS, User
+from password_hasher import check_dummy_password
+from sqlalchemy import lambda_stmt, or_, select
+from sqlalchemy.exc import IntegrityError
 from typing import Tuple, Dict, Any
 import re
 
 load_dotenv()
 
-logging.basicConfig(level=logging.INFO)
-handler = RotatingFileHandler(
-    'auth.log',
-    maxBytes=10485760,
-    backupCount=5,
-    encoding='utf-8'
-)
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - [%(process)d] - %(message)s'
-)
-handler.setFormatter(formatter)
+# Handlers are attached by logging_setup.setup_logging from create_app
 logger = logging.getLogger('auth')
-logger.addHandler(handler)
 
 bp = Blueprint('auth', __name__)
 
@@ -49,10 +43,22 @@ CORS(bp, resources={
 # Constants
 TOKEN_EXPIRY = int(os.getenv('TOKEN_EXPIRY_HOURS', 24))
 REFRESH_TOKEN_EXPIRY = int(os.getenv('REFRESH_TOKEN_EXPIRY_DAYS', 30))
-MAX_LOGIN_ATTEMPTS = int(os.getenv('MAX_LOGIN_ATTEMPTS', 5))
-LOGIN_ATTEMPT_TIMEOUT = int(os.getenv('LOGIN_ATTEMPT_TIMEOUT', 15))  # minutes
 PASSWORD_MIN_LENGTH = int(os.getenv('PASSWORD_MIN_LENGTH', 8))
 
+# Verified access-token claims keyed by (signing key, token), so repeat
+# requests with the same token skip the signature check while a rotated
+# SECRET_KEY or another app in the process never reuses them. An entry
+# never outlives the token's exp claim; revocation is still checked
+# against the blacklist each time.
+JWT_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', 10000))
+JWT_CACHE_TTL = int(os.getenv('JWT_CACHE_TTL', 60))  # seconds
+_jwt_cache = TLRUCache(
+    maxsize=JWT_CACHE_SIZE,
+    ttu=lambda _key, claims, now: min(now + JWT_CACHE_TTL, claims.get('exp', now)),
+    timer=time.time
+)
+_jwt_cache_lock = threading.Lock()
+
 class UserSchema(Schema):
     """Schema for user registration validation with enhanced security rules"""
     username = fields.Str(
@@ -89,6 +95,11 @@ class LoginSchema(Schema):
     email = fields.Email(required=True)
     password = fields.Str(required=True)
 
+# Schemas are stateless once built; instantiating them copies every
+# declared field, so build each once instead of per request
+user_schema = UserSchema()
+login_schema = LoginSchema()
+
 def generate_tokens(user_id: int) -> Dict[str, str]:
     """Generate secure access and refresh tokens with rate limiting"""
     try:
@@ -132,6 +143,24 @@ def generate_tokens(user_id: int) -> Dict[str, str]:
         logger.error(f"Token generation error for user {user_id}: {str(e)}")
         raise
 
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Decode an access token, reusing claims verified in the last JWT_CACHE_TTL"""
+    secret = current_app.config['SECRET_KEY']
+    cache_key = (secret, token)
+    with _jwt_cache_lock:
+        data = _jwt_cache.get(cache_key)
+    if data is not None:
+        return data
+
+    data = jwt.decode(token, secret, algorithms=["HS256"])
+
+    if data.get('type') != 'access':
+        raise jwt.InvalidTokenError('Invalid token type')
+
+    with _jwt_cache_lock:
+        _jwt_cache[cache_key] = data
+    return data
+
 def token_required(f):
     """Enhanced token verification decorator with additional security checks"""
     @wraps(f)
@@ -144,16 +173,11 @@ def token_required(f):
             if cache.get(f'blacklisted_token_{token}'):
                 raise jwt.InvalidTokenError('Token has been revoked')
 
-            data = jwt.decode(
-                token,
-                current_app.config['SECRET_KEY'],
-                algorithms=["HS256"]
-            )
-
-            if data.get('type') != 'access':
-                raise jwt.InvalidTokenError('Invalid token type')
+            data = decode_access_token(token)
 
-            current_user = User.query.filter_by(id=data['id']).first()
+            # Primary key lookup: served from the identity map when the
+            # user is already loaded in this session
+            current_user = db.session.get(User, data['id'])
             if not current_user:
                 raise jwt.InvalidTokenError('User not found')
 
@@ -161,9 +185,9 @@ def token_required(f):
                 raise jwt.InvalidTokenError('User account is disabled')
 
             rate_limit_key = f'rate_limit_{current_user.id}'
-            if cache.get(rate_limit_key):
+            # 1 request per second per user, checked and set in one round trip
+            if cache.add(rate_limit_key, 1, timeout=1) is False:
                 raise jwt.InvalidTokenError('Too many requests')
-            cache.set(rate_limit_key, 1, timeout=1)  # 1 request per second per user
 
             return f(current_user, *args, **kwargs)
 
@@ -204,19 +228,33 @@ def signup() -> Tuple[Dict[str, Any], int]:
         if 'phone' in data:
             data['phone_contact'] = data.pop('phone')
 
-        errors = UserSchema().validate(data)
+        errors = user_schema.validate(data)
         if errors:
             return jsonify({'errors': errors}), 400
 
-        if User.query.filter(User.email.ilike(data['email'])).first():
+        email = data['email'].lower().strip()
+        username = data['username'].strip()
+
+        # One probe for both fields, reading only the two columns. Both
+        # sides are plain equalities on unique columns, so each is served
+        # by its index; the _ci collation makes the username comparison
+        # case-insensitive, as emails are stored lowercased already.
+        # Up to two rows: the email and the username may belong to
+        # different users, and the email error takes precedence.
+        taken = db.session.execute(
+            select(User.email, User.username)
+            .where(or_(User.email == email,
+                       User.username == username))
+            .limit(2)
+        ).all()
+        if any(row.email == email for row in taken):
             return jsonify({'message': 'Email already exists'}), 400
-
-        if User.query.filter(User.username.ilike(data['username'])).first():
+        if taken:
             return jsonify({'message': 'Username already exists'}), 400
 
         new_user = User(
-            username=data['username'].strip(),
-            email=data['email'].lower().strip(),
+            username=username,
+            email=email,
             phone_contact=data.get('phone_contact', '').strip()
         )
         new_user.set_password(data['password'])
@@ -241,6 +279,10 @@ def signup() -> Tuple[Dict[str, Any], int]:
 
     except ValidationError as err:
         return jsonify({'errors': err.messages}), 400
+    except IntegrityError:
+        # A concurrent signup took the email or username after the check
+        db.session.rollback()
+        return jsonify({'message': 'Email or username already exists'}), 400
     except Exception as e:
         logger.error(f"Signup error: {str(e)}")
         db.session.rollback()
@@ -255,7 +297,7 @@ def login() -> Tuple[Dict[str, Any], int]:
         if not data:
             return jsonify({'message': 'No data provided'}), 400
 
-        errors = LoginSchema().validate(data)
+        errors = login_schema.validate(data)
         if errors:
             return jsonify({'errors': errors}), 400
 
@@ -266,8 +308,16 @@ def login() -> Tuple[Dict[str, Any], int]:
                 'message': f'Too many login attempts. Please try again in {LOGIN_ATTEMPT_TIMEOUT} minutes'
             }), 429
 
-        user = User.query.filter(User.email.ilike(email)).first()
-        if not user or not user.check_password(data['password']):
+        # Emails are stored lowercased, so a plain equality on the unique
+        # index finds the row; the lambda statement caches its compiled SQL
+        user = db.session.scalars(
+            lambda_stmt(lambda: select(User).where(User.email == email))
+        ).first()
+        if user is None:
+            valid = check_dummy_password(data['password'])
+        else:
+            valid = user.check_password(data['password'])
+        if not valid:
             record_login_attempt(email, False)
             return jsonify({'message': 'Invalid credentials'}), 401
 
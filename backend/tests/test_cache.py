@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Unit tests for the Redis cache wrapper"""
+import unittest
+from cache import Cache
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the Redis calls Cache makes"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        if not isinstance(value, bytes):
+            value = str(value).encode()
+        self.data[key] = value
+        return True
+
+    def incr(self, key):
+        value = int(self.data.get(key, b'0')) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+
+class TestCache(unittest.TestCase):
+    """Test cases for Cache encoding"""
+
+    def setUp(self):
+        """Build a Cache wired to a FakeRedis"""
+        self.cache = Cache.__new__(Cache)
+        self.cache._redis = FakeRedis()
+
+    def test_set_and_add_round_trip(self):
+        """Test values written by set and add read back unchanged"""
+        values = ['text', b'raw', 3, 1.5, {'a': [1, 2]}, {1, 2}]
+        for i, value in enumerate(values):
+            self.assertTrue(self.cache.set(f'set_{i}', value))
+            self.assertTrue(self.cache.add(f'add_{i}', value))
+            self.assertEqual(self.cache.get(f'set_{i}'), value)
+            self.assertEqual(self.cache.get(f'add_{i}'), value)
+
+    def test_add_counter_can_be_incremented(self):
+        """Test a counter created by add works with incr"""
+        self.assertTrue(self.cache.add('counter', 1))
+        self.assertFalse(self.cache.add('counter', 5))
+        self.assertEqual(self.cache.incr('counter'), 2)
+        self.assertEqual(self.cache.get('counter'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
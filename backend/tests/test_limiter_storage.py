@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Unit tests for BatchedRedisStorage.
+This module checks the local counting, seeding and flushing of the
+write-batching rate limit storage against a stubbed Redis client.
+"""
+import os
+import unittest
+from limiter_storage import BatchedRedisStorage
+from unittest.mock import patch
+
+
+class FakePipeline:
+    """Queues commands and runs them against a FakeRedis on execute"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def get(self, key):
+        self.commands.append(lambda: self.redis.get(key))
+
+    def pttl(self, key):
+        self.commands.append(lambda: self.redis.pttl(key))
+
+    def incr_expire(self, key, expiry, amount):
+        self.commands.append(lambda: self.redis.incr_expire(key, expiry, amount))
+
+    def execute(self):
+        self.redis.pipelines += 1
+        if self.redis.on_execute:
+            self.redis.on_execute()
+        results = [command() for command in self.commands]
+        self.commands = []
+        return results
+
+
+class FakeRedis:
+    """In-memory stand-in for the few Redis calls the storage makes"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.pipelines = 0
+        self.on_execute = None
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def get(self, key):
+        value = self.data.get(key)
+        return None if value is None else str(value).encode()
+
+    def pttl(self, key):
+        return self.ttls.get(key, -2) if key in self.data else -2
+
+    def delete(self, key):
+        self.ttls.pop(key, None)
+        return int(self.data.pop(key, None) is not None)
+
+    def incr_expire(self, key, expiry, amount):
+        if key not in self.data:
+            self.ttls[key] = expiry * 1000
+        self.data[key] = self.data.get(key, 0) + amount
+        return self.data[key]
+
+
+class TestBatchedRedisStorage(unittest.TestCase):
+    """
+    Test cases for BatchedRedisStorage.
+
+    The flush thread is never started; tests call flush() directly and
+    control the clock through time.monotonic.
+    """
+
+    def setUp(self):
+        """Build a storage wired to a FakeRedis with a fixed clock."""
+        self.storage = BatchedRedisStorage('batched+redis://localhost:6379')
+        self.redis = FakeRedis()
+        self.storage.storage = self.redis
+        self.storage.lua_incr_expire = (
+            lambda keys, args, client: client.incr_expire(keys[0], *args))
+        self.storage._flusher_pid = os.getpid()
+
+        self.now = 1000.0
+        patcher = patch('limiter_storage.time.monotonic',
+                        side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def key(self, name):
+        return self.storage.prefixed_key(name)
+
+    def test_seed_reads_shared_total(self):
+        """Test that the first hit in a window starts from the Redis total."""
+        self.redis.data[self.key('ip')] = 3
+        self.redis.ttls[self.key('ip')] = 30000
+
+        self.assertEqual(self.storage.incr('ip', 60), 4)
+        self.assertEqual(self.storage._known['ip'], (3, self.now + 30))
+
+    def test_local_estimate_without_round_trips(self):
+        """Test that repeat hits are counted locally until a flush."""
+        self.storage.incr('ip', 60)
+        pipelines = self.redis.pipelines
+
+        self.assertEqual(self.storage.incr('ip', 60), 2)
+        self.assertEqual(self.storage.incr('ip', 60, amount=3), 5)
+        self.assertEqual(self.storage.get('ip'), 5)
+        self.assertEqual(self.redis.pipelines, pipelines)
+        self.assertNotIn(self.key('ip'), self.redis.data)
+
+    def test_flush_sends_totals(self):
+        """Test that a flush writes pending hits and refreshes the total."""
+        for _ in range(3):
+            self.storage.incr('ip', 60)
+        # Hits another worker already flushed in this window
+        self.redis.data[self.key('ip')] = 2
+        self.redis.ttls[self.key('ip')] = 60000
+
+        self.storage.flush()
+
+        self.assertEqual(self.redis.data[self.key('ip')], 5)
+        self.assertEqual(self.storage._pending, {})
+        self.assertEqual(self.storage._known['ip'][0], 5)
+        self.assertEqual(self.storage.get('ip'), 5)
+
+    def test_inflight_hits_counted_during_flush(self):
+        """Test that hits being flushed stay in the estimate meanwhile."""
+        for _ in range(3):
+            self.storage.incr('ip', 60)
+        seen = []
+        self.redis.on_execute = lambda: seen.append(
+            (self.storage.get('ip'), self.storage.incr('ip', 60)))
+
+        self.storage.flush()
+
+        self.assertEqual(seen, [(3, 4)])
+        self.assertEqual(self.storage.get('ip'), 4)
+        self.assertEqual(self.storage._inflight, {})
+
+    def test_failed_flush_keeps_hits(self):
+        """Test that a failed write puts its hits back as pending."""
+        for _ in range(3):
+            self.storage.incr('ip', 60)
+
+        def fail():
+            self.storage.incr('ip', 60)
+            raise ConnectionError('redis down')
+        self.redis.on_execute = fail
+
+        with self.assertRaises(ConnectionError):
+            self.storage.flush()
+        self.assertEqual(self.storage.get('ip'), 4)
+        self.assertEqual(self.storage._pending['ip'], (4, 60))
+
+        self.redis.on_execute = None
+        self.storage.flush()
+        self.assertEqual(self.redis.data[self.key('ip')], 4)
+
+    def test_window_rollover(self):
+        """Test that a total from an ended window is not reused."""
+        self.storage.incr('ip', 60)
+        self.storage.flush()
+
+        self.now += 61
+        del self.redis.data[self.key('ip')]
+
+        self.assertEqual(self.storage.incr('ip', 60), 1)
+        self.assertEqual(self.storage._known['ip'], (0, self.now + 60))
+
+    def test_flush_prunes_expired_keys(self):
+        """Test that keys not hit again leave the local table."""
+        self.storage.incr('old', 10)
+        self.storage.flush()
+        self.assertIn('old', self.storage._known)
+
+        self.now += self.storage.PRUNE_INTERVAL + 11
+        self.storage.flush()
+
+        self.assertNotIn('old', self.storage._known)
+
+    def test_clear(self):
+        """Test that clear drops local state and the Redis key."""
+        self.storage.incr('ip', 60)
+        self.storage.flush()
+        self.storage.incr('ip', 60)
+
+        self.storage.clear('ip')
+
+        self.assertNotIn('ip', self.storage._known)
+        self.assertNotIn('ip', self.storage._pending)
+        self.assertNotIn(self.key('ip'), self.redis.data)
+        self.assertEqual(self.storage.get('ip'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,8 +5,9 @@ import unittest
 import uuid
 from app import create_app, db
 from datetime import datetime
-from models.base_model import BaseModel
-from sqlalchemy.exc import SQLAlchemyError
+from models.base_model import BaseModel, UUID_VERSION, _UuidPool
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from unittest.mock import patch
 
 
@@ -74,6 +75,39 @@ class TestBaseModel(unittest.TestCase):
         except ValueError:
             self.fail("ID is not a valid UUID")
 
+    def test_uuid_pool_ids(self):
+        """Test pooled ids are distinct, canonical UUIDs."""
+        ids = [_UuidPool.next_uuid_str()
+               for _ in range(_UuidPool.UUID_BATCH * 2 + 1)]
+
+        self.assertEqual(len(set(ids)), len(ids))
+        for value in ids[:10]:
+            uuid_obj = uuid.UUID(value)
+            self.assertEqual(str(uuid_obj), value)
+            self.assertEqual(uuid_obj.version, UUID_VERSION)
+            self.assertEqual(uuid_obj.variant, uuid.RFC_4122)
+
+    @unittest.skipUnless(UUID_VERSION == 7, "time-ordered ids disabled")
+    def test_uuid7_ids_are_time_ordered(self):
+        """Test ids generated in later milliseconds sort after earlier ones."""
+        first = _UuidPool.next_uuid_str()
+        time.sleep(0.002)
+        second = _UuidPool.next_uuid_str()
+
+        self.assertLess(first, second)
+        timestamp_ms = int(second.replace('-', '')[:12], 16)
+        self.assertLessEqual(abs(timestamp_ms - time.time() * 1000), 1000)
+
+    def test_id_column_default_is_per_row(self):
+        """Test the id column default yields a new id for every row."""
+        db.session.execute(insert(TestModel),
+                           [{'name': f'row{i}'} for i in range(1000)])
+        ids = db.session.scalars(
+            select(TestModel.id).where(TestModel.name.like('row%'))).all()
+
+        self.assertEqual(len(ids), 1000)
+        self.assertEqual(len(set(ids)), 1000)
+
     def test_model_initialization_with_attributes(self):
         """Test model initialization with provided attributes."""
         test_name = "test_name"
@@ -105,6 +139,24 @@ class TestBaseModel(unittest.TestCase):
 
         self.assertIsNone(model)
 
+    def test_get_by_ids(self):
+        """Test fetching several records at once."""
+        self.test_model.save()
+        other = TestModel(name="other")
+        other.save()
+        deleted = TestModel(name="deleted")
+        deleted.save()
+        deleted.soft_delete()
+
+        found = TestModel.get_by_ids(
+            [self.test_model.id, other.id, deleted.id, str(uuid.uuid4())])
+
+        self.assertEqual(set(found), {self.test_model.id, other.id})
+        self.assertIs(found[other.id], other)
+        self.assertIn(deleted.id,
+                      TestModel.get_by_ids([deleted.id], include_deleted=True))
+        self.assertEqual(TestModel.get_by_ids([]), {})
+
     def test_get_by_id_invalid_id(self):
         """Test get_by_id with invalid ID format."""
         invalid_id = "invalid-id"
@@ -216,6 +268,43 @@ class TestBaseModel(unittest.TestCase):
             self.assertNotEqual(self.test_model.updated_at,
                                 original_updated_at)
 
+    def test_bulk_create(self):
+        """Test creating several records in one statement."""
+        ids = TestModel.bulk_create([
+            {'name': 'bulk1'},
+            {'name': 'bulk2', 'description': 'second'}
+        ])
+
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(len(set(ids)), 2)
+        first = TestModel.get_by_id(ids[0])
+        second = TestModel.get_by_id(ids[1])
+        self.assertEqual(first.name, 'bulk1')
+        self.assertEqual(second.description, 'second')
+        self.assertIsNotNone(first.created_at)
+        self.assertFalse(first.is_deleted)
+
+    def test_bulk_create_empty_id(self):
+        """Test bulk create generates ids for items passing id=None."""
+        ids = TestModel.bulk_create([{'name': 'noid', 'id': None}])
+
+        self.assertIsNotNone(ids[0])
+        self.assertEqual(TestModel.get_by_id(ids[0]).name, 'noid')
+
+    def test_bulk_create_chunked(self):
+        """Test bulk create splits large batches across statements."""
+        with patch.object(TestModel, 'BULK_INSERT_CHUNK', 2):
+            ids = TestModel.bulk_create([{'name': f'chunk{i}'} for i in range(5)])
+
+        self.assertEqual(len(ids), 5)
+        names = [TestModel.get_by_id(id).name for id in ids]
+        self.assertEqual(names, [f'chunk{i}' for i in range(5)])
+
+    def test_bulk_create_invalid_field(self):
+        """Test bulk create rejects unknown fields before inserting."""
+        with self.assertRaises(AttributeError):
+            TestModel.bulk_create([{'invalid_field': 'value'}])
+
     def test_save_with_db_error(self):
         """Test save operation with database error."""
         with patch.object(db.session, 'commit') as mock_commit:
@@ -223,6 +312,26 @@ class TestBaseModel(unittest.TestCase):
             with self.assertRaises(SQLAlchemyError):
                 self.test_model.save()
 
+    def test_save_does_not_retry_deterministic_errors(self):
+        """Test save raises non-transient errors without retrying."""
+        with patch.object(db.session, 'commit') as mock_commit:
+            mock_commit.side_effect = OperationalError(
+                "INSERT", {}, Exception(1054, "Unknown column"))
+            with self.assertRaises(OperationalError):
+                self.test_model.save()
+            self.assertEqual(mock_commit.call_count, 1)
+
+    def test_save_retries_deadlock(self):
+        """Test save retries a deadlock and succeeds."""
+        with patch.object(db.session, 'commit') as mock_commit:
+            mock_commit.side_effect = [
+                OperationalError("INSERT", {},
+                                 Exception(1213, "Deadlock found")),
+                None
+            ]
+            self.assertTrue(self.test_model.save())
+            self.assertEqual(mock_commit.call_count, 2)
+
     def test_delete_with_db_error(self):
         """Test delete operation with database error."""
         self.test_model.save()
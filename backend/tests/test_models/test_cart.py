@@ -4,6 +4,7 @@ Unit tests for Cart model.
 This module contains comprehensive test cases for the Cart class,
 validating all its methods and edge cases.
 """
+import json
 import unittest
 from app import create_app, db
 from unittest.mock import Mock, patch
@@ -84,20 +85,20 @@ class TestCart(unittest.TestCase):
         self.assertIsInstance(self.cart.items, dict)
         self.assertIsInstance(self.cart.total_price, float)
 
-    @patch('models.cart.MenuItem.get_by_id')
-    def test_add_item_new(self, mock_get_by_id):
+    @patch('models.cart.MenuItem.get_by_ids')
+    def test_add_item_new(self, mock_get_by_ids):
         """
         Test adding a new item to cart.
 
         Args:
-            mock_get_by_id: Mocked MenuItem.get_by_id method
+            mock_get_by_ids: Mocked MenuItem.get_by_ids method
 
         Validates:
             - Correct quantity is set
             - Total price is updated
             - Save method is called
         """
-        mock_get_by_id.return_value = self.menu_item
+        mock_get_by_ids.return_value = {"item-123": self.menu_item}
 
         self.cart.add_item("item-123", quantity=2)
 
@@ -106,19 +107,19 @@ class TestCart(unittest.TestCase):
         self.assertEqual(self.cart.total_price, 20.0)
         self.cart.save.assert_called_once()
 
-    @patch('models.cart.MenuItem.get_by_id')
-    def test_add_item_existing(self, mock_get_by_id):
+    @patch('models.cart.MenuItem.get_by_ids')
+    def test_add_item_existing(self, mock_get_by_ids):
         """
         Test adding an existing item to cart.
 
         Args:
-            mock_get_by_id: Mocked MenuItem.get_by_id method
+            mock_get_by_ids: Mocked MenuItem.get_by_ids method
 
         Validates:
             - Quantity is properly accumulated
             - Total price is correctly updated
         """
-        mock_get_by_id.return_value = self.menu_item
+        mock_get_by_ids.return_value = {"item-123": self.menu_item}
 
         self.cart.add_item("item-123", quantity=1)
         self.cart.add_item("item-123", quantity=2)
@@ -127,13 +128,13 @@ class TestCart(unittest.TestCase):
         self.assertEqual(self.cart.total_price, 30.0)
         self.assertEqual(self.cart.save.call_count, 2)
 
-    @patch('models.cart.MenuItem.get_by_id')
-    def test_add_item_with_toppings(self, mock_get_by_id):
+    @patch('models.cart.MenuItem.get_by_ids')
+    def test_add_item_with_toppings(self, mock_get_by_ids):
         """
         Test adding item with custom toppings.
 
         Args:
-            mock_get_by_id: Mocked MenuItem.get_by_id method
+            mock_get_by_ids: Mocked MenuItem.get_by_ids method
 
         Validates:
             - Toppings are properly stored
@@ -143,7 +144,8 @@ class TestCart(unittest.TestCase):
             {"name": "Cheese", "price": 1.0},
             {"name": "Pepperoni", "price": 2.0}
         ]
-        mock_get_by_id.return_value = self.menu_item
+        self.menu_item.topping_prices = {"Cheese": 1.0, "Pepperoni": 2.0}
+        mock_get_by_ids.return_value = {"item-123": self.menu_item}
 
         toppings = ["Cheese", "Pepperoni"]
         self.cart.add_item("item-123", quantity=1, selected_toppings=toppings)
@@ -155,13 +157,13 @@ class TestCart(unittest.TestCase):
         expected_price = 13.0  # Base price (10.0) + Cheese (1.0) + Pepperoni (2.0)
         self.assertEqual(self.cart.total_price, expected_price)
 
-    @patch('models.cart.MenuItem.get_by_id')
-    def test_add_item_invalid_cases(self, mock_get_by_id):
+    @patch('models.cart.MenuItem.get_by_ids')
+    def test_add_item_invalid_cases(self, mock_get_by_ids):
         """
         Test adding items with invalid parameters.
 
         Args:
-            mock_get_by_id: Mocked MenuItem.get_by_id method
+            mock_get_by_ids: Mocked MenuItem.get_by_ids method
 
         Validates various error cases:
             - Zero quantity
@@ -169,7 +171,7 @@ class TestCart(unittest.TestCase):
             - Unavailable item
             - Non-existent item
         """
-        mock_get_by_id.return_value = self.menu_item
+        mock_get_by_ids.return_value = {"item-123": self.menu_item}
 
         with self.assertRaises(ValueError) as context:
             self.cart.add_item("item-123", quantity=0)
@@ -179,16 +181,134 @@ class TestCart(unittest.TestCase):
             self.cart.add_item("item-123", quantity=-1)
         self.assertIn("Quantity must be between 1 and 99", str(context.exception))
 
+        with self.assertRaises(ValueError) as context:
+            self.cart.add_item("item-123", quantity=100)
+        self.assertIn("Cannot exceed 99", str(context.exception))
+        self.assertNotIn("item-123", self.cart.items)
+
         self.menu_item.is_available = False
         with self.assertRaises(ValueError) as context:
             self.cart.add_item("item-123")
         self.assertIn("not available", str(context.exception))
 
-        mock_get_by_id.return_value = None
+        mock_get_by_ids.return_value = {}
         with self.assertRaises(ValueError) as context:
             self.cart.add_item("non-existent")
         self.assertIn("not found", str(context.exception))
 
+    @patch('models.cart.MenuItem.get_by_ids')
+    def test_add_items_batch(self, mock_get_by_ids):
+        """
+        Test adding several items in one call.
+
+        Args:
+            mock_get_by_ids: Mocked MenuItem.get_by_ids method
+
+        Validates:
+            - Menu items are fetched once
+            - Repeated ids accumulate quantity
+            - Cart is saved once
+            - An invalid entry leaves the cart unchanged
+        """
+        other_item = Mock(spec=MenuItem)
+        other_item.price = 5.0
+        other_item.is_available = True
+        mock_get_by_ids.return_value = {
+            "item-123": self.menu_item,
+            "item-456": other_item
+        }
+
+        self.cart.add_items([
+            ("item-123", 1, None),
+            ("item-456", 2, None),
+            ("item-123", 2, None)
+        ])
+
+        mock_get_by_ids.assert_called_once()
+        self.assertEqual(self.cart.items["item-123"]["quantity"], 3)
+        self.assertEqual(self.cart.items["item-456"]["quantity"], 2)
+        self.assertEqual(self.cart.total_price, 40.0)
+        self.cart.save.assert_called_once()
+
+        with self.assertRaises(ValueError):
+            self.cart.add_items([("item-456", 1, None), ("missing", 1, None)])
+        self.assertEqual(self.cart.items["item-456"]["quantity"], 2)
+        self.cart.save.assert_called_once()
+
+    @patch('models.cart.MenuItem.get_by_ids')
+    def test_bulk_update(self, mock_get_by_ids):
+        """
+        Test applying mixed quantity changes in one call.
+
+        Args:
+            mock_get_by_ids: Mocked MenuItem.get_by_ids method
+
+        Validates:
+            - Positive deltas add, negative deltas reduce
+            - Lines reaching zero are removed
+            - Toppings of None are kept
+            - Cart is saved once
+        """
+        self.menu_item.topping_prices = {"cheese": 0.0}
+        other_item = Mock(spec=MenuItem)
+        other_item.price = 5.0
+        other_item.is_available = True
+        other_item.topping_prices = {"ice": 0.0}
+        mock_get_by_ids.return_value = {
+            "item-123": self.menu_item,
+            "item-456": other_item
+        }
+        self.cart.items = {
+            "item-123": {"quantity": 3, "toppings": ["cheese"]},
+            "item-456": {"quantity": 1, "toppings": []}
+        }
+
+        self.cart.bulk_update([
+            ("item-123", -1, None),
+            ("item-456", -1, None),
+            ("item-456", 2, ["ice"])
+        ])
+
+        self.assertEqual(self.cart.items["item-123"],
+                         {"quantity": 2, "toppings": ["cheese"]})
+        self.assertEqual(self.cart.items["item-456"],
+                         {"quantity": 2, "toppings": ["ice"]})
+        self.assertEqual(self.cart.total_price, 30.0)
+        self.cart.save.assert_called_once()
+
+        self.cart.bulk_update([("item-456", -2, None)])
+        self.assertNotIn("item-456", self.cart.items)
+
+        with self.assertRaises(ValueError) as context:
+            self.cart.bulk_update([("item-789", -1, None)])
+        self.assertIn("Item not in cart", str(context.exception))
+
+    @patch('models.cart.MenuItem.get_by_ids')
+    def test_menu_items_cached_per_request(self, mock_get_by_ids):
+        """
+        Test repeated lookups within one request reuse loaded items.
+
+        Args:
+            mock_get_by_ids: Mocked MenuItem.get_by_ids method
+
+        Validates:
+            - A second operation in the same request does not query again
+            - A new request starts with an empty cache
+        """
+        mock_get_by_ids.return_value = {"item-123": self.menu_item}
+
+        # Each request runs in its own app context, as under a real server
+        with self.app.app_context(), self.app.test_request_context():
+            self.cart.add_item("item-123", quantity=1)
+            self.cart.add_item("item-123", quantity=1)
+            self.assertEqual(mock_get_by_ids.call_count, 1)
+
+        with self.app.app_context(), self.app.test_request_context():
+            self.cart._update_total()
+            self.assertEqual(mock_get_by_ids.call_count, 2)
+
+        self.assertEqual(self.cart.items["item-123"]["quantity"], 2)
+
     def test_remove_item_variations(self):
         """
         Test all variations of removing items from cart.
@@ -214,6 +334,29 @@ class TestCart(unittest.TestCase):
             self.cart.remove_item("non-existent")
         self.assertIn("Item not in cart", str(context.exception))
 
+    def test_in_place_item_changes_are_persisted(self):
+        """
+        Test that editing cart lines in place marks the cart dirty.
+
+        Validates:
+            - Adding a line to a loaded cart is flushed
+            - Replacing a line's quantity is flushed
+        """
+        cart = Cart(user_id="test-user-456")
+        cart.save()
+
+        cart.items["item-123"] = {"quantity": 1, "toppings": []}
+        cart.save()
+        db.session.expire(cart)
+        self.assertEqual(cart.items["item-123"]["quantity"], 1)
+
+        with patch('models.cart.MenuItem.get_by_ids', return_value={}):
+            cart.update_item_quantity("item-123", 4)
+        db.session.expire(cart)
+        self.assertEqual(cart.items["item-123"]["quantity"], 4)
+
+        cart.hard_delete()
+
     def test_clear_cart(self):
         """
         Test clearing the cart completely.
@@ -235,20 +378,20 @@ class TestCart(unittest.TestCase):
         self.assertEqual(self.cart.total_price, 0.0)
         self.cart.save.assert_called_once()
 
-    @patch('models.cart.MenuItem.get_by_id')
-    def test_to_dict(self, mock_get_by_id):
+    @patch('models.cart.MenuItem.get_by_ids')
+    def test_to_dict(self, mock_get_by_ids):
         """
         Test converting cart to dictionary representation.
 
         Args:
-            mock_get_by_id: Mocked MenuItem.get_by_id method
+            mock_get_by_ids: Mocked MenuItem.get_by_ids method
 
         Validates:
             - All required fields are present
             - Nested item information is correct
             - Types are correct
         """
-        mock_get_by_id.return_value = self.menu_item
+        mock_get_by_ids.return_value = {"item-123": self.menu_item}
         self.cart.items = {
             "item-123": {
                 "quantity": 1,
@@ -269,6 +412,34 @@ class TestCart(unittest.TestCase):
         self.assertEqual(item_data["toppings"], ["cheese"])
         self.assertEqual(item_data["item"], self.menu_item.to_dict())
 
+    @patch('models.cart.MenuItem.get_by_ids')
+    def test_to_json(self, mock_get_by_ids):
+        """
+        Test serializing the cart straight to JSON bytes.
+
+        Args:
+            mock_get_by_ids: Mocked MenuItem.get_by_ids method
+
+        Validates:
+            - Output is bytes
+            - Decoded payload carries the to_dict fields
+        """
+        mock_get_by_ids.return_value = {"item-123": self.menu_item}
+        self.cart.items = {"item-123": {"quantity": 2, "toppings": []}}
+        self.cart.total_price = 20.0
+
+        payload = self.cart.to_json()
+
+        self.assertIsInstance(payload, bytes)
+        data = json.loads(payload)
+        self.assertEqual(data["total_price"], 20.0)
+        self.assertEqual(data["items"]["item-123"], {
+            "quantity": 2,
+            "toppings": [],
+            "item": self.menu_item.to_dict.return_value,
+            "subtotal": 20.0
+        })
+
     def test_update_total(self):
         """
         Test total price calculation.
@@ -278,16 +449,16 @@ class TestCart(unittest.TestCase):
             - Handling of missing menu items
             - Precision of float calculations
         """
-        with patch('models.cart.MenuItem.get_by_id') as mock_get_by_id:
+        with patch('models.cart.MenuItem.get_by_ids') as mock_get_by_ids:
             item1 = Mock(spec=MenuItem)
             item1.price = 10.0
             item2 = Mock(spec=MenuItem)
             item2.price = 15.0
 
-            mock_get_by_id.side_effect = lambda x: {
+            mock_get_by_ids.return_value = {
                 "item-123": item1,
                 "item-456": item2
-            }.get(x)
+            }
 
             self.cart.items = {
                 "item-123": {"quantity": 2, "toppings": []},
@@ -299,6 +470,7 @@ class TestCart(unittest.TestCase):
 
             # 2 * 10.0 + 1 * 15.0 = 35.0
             self.assertEqual(self.cart.total_price, 35.0)
+            mock_get_by_ids.assert_called_once()
 
 
 if __name__ == '__main__':
@@ -243,6 +243,57 @@ class TestMenuItem(unittest.TestCase):
 
         self.assertIsNone(db.session.get(MenuItem, item_id))
 
+    def test_get_by_category(self):
+        """
+        Test retrieving menu items by category.
+
+        Validates:
+            - Only items in the requested category are returned
+            - Unavailable items are excluded unless requested
+            - Repeat calls with another category bind the new value
+        """
+        data = {**self.valid_item_data, 'category': 'Category Test Mains'}
+        available = MenuItem(**data)
+        unavailable = MenuItem(**{**data, 'name': 'Sold Out Burger',
+                                  'is_available': False})
+        drink = MenuItem(**{**data, 'name': 'Test Soda',
+                            'category': 'Category Test Drinks'})
+        db.session.add_all([available, unavailable, drink])
+        db.session.flush()
+
+        self.assertEqual(MenuItem.get_by_category('Category Test Mains'),
+                         [available])
+        self.assertEqual(
+            {item.id for item in MenuItem.get_by_category(
+                'Category Test Mains', include_unavailable=True)},
+            {available.id, unavailable.id})
+        self.assertEqual(MenuItem.get_by_category('Category Test Drinks'),
+                         [drink])
+
+    def test_get_menu_items(self):
+        """
+        Test retrieving the whole menu grouped by category.
+
+        Validates:
+            - Items are grouped under their category
+            - Unavailable items are excluded unless requested
+        """
+        data = {**self.valid_item_data, 'category': 'Menu Test Mains'}
+        burger = MenuItem(**data)
+        sold_out = MenuItem(**{**data, 'name': 'Sold Out Burger',
+                               'is_available': False})
+        soda = MenuItem(**{**data, 'name': 'Test Soda',
+                           'category': 'Menu Test Drinks'})
+        db.session.add_all([burger, sold_out, soda])
+        db.session.flush()
+
+        menu = MenuItem.get_menu_items()
+        self.assertEqual(menu['Menu Test Mains'], [burger])
+        self.assertEqual(menu['Menu Test Drinks'], [soda])
+
+        menu = MenuItem.get_menu_items(include_unavailable=True)
+        self.assertEqual(menu['Menu Test Mains'], [sold_out, burger])
+
     def test_to_dict(self):
         """
         Test converting MenuItem to dictionary representation.
@@ -273,6 +324,57 @@ class TestMenuItem(unittest.TestCase):
         self.assertIsInstance(item_dict['toppings'], list)
         self.assertIsInstance(item_dict['is_available'], bool)
 
+    def test_to_dict_cache_invalidation(self):
+        """
+        Test the cached dictionary follows changes to the item.
+
+        Validates:
+            - Repeated calls return equal, independent dicts
+            - Assigning a column is reflected
+            - Values reloaded from the database are reflected
+        """
+        menu_item = MenuItem(**self.valid_item_data)
+        db.session.add(menu_item)
+        db.session.flush()
+
+        first = menu_item.to_dict()
+        first['name'] = 'Scribbled'
+        self.assertEqual(menu_item.to_dict()['name'], 'Test Burger')
+
+        menu_item.name = 'Renamed Burger'
+        self.assertEqual(menu_item.to_dict()['name'], 'Renamed Burger')
+        self.assertNotIn('price', menu_item.to_dict(exclude={'price'}))
+
+        db.session.flush()
+        db.session.execute(
+            MenuItem.__table__.update()
+            .where(MenuItem.id == menu_item.id)
+            .values(price=12.5)
+        )
+        db.session.expire(menu_item)
+        self.assertEqual(menu_item.to_dict()['price'], 12.5)
+
+    def test_topping_prices(self):
+        """
+        Test the topping price map follows the toppings column.
+
+        Validates:
+            - Names map to prices
+            - The map is reused until toppings are reassigned
+        """
+        menu_item = MenuItem(**{
+            **self.valid_item_data,
+            'toppings': [{'name': 'cheese', 'price': 1.5},
+                         {'name': 'bacon', 'price': 2.0}]
+        })
+
+        prices = menu_item.topping_prices
+        self.assertEqual(prices, {'cheese': 1.5, 'bacon': 2.0})
+        self.assertIs(menu_item.topping_prices, prices)
+
+        menu_item.toppings = [{'name': 'onion', 'price': 0.5}]
+        self.assertEqual(menu_item.topping_prices, {'onion': 0.5})
+
     def test_repr(self):
         """
         Test string representation of MenuItem.
@@ -7,9 +7,10 @@ validating all its methods and edge cases.
 import unittest
 from app import create_app, db
 from datetime import datetime, UTC, timedelta
+from models.menu_item import MenuItem
 from models.order import Order
 from models.user import User
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.exc import IntegrityError, OperationalError
 from unittest.mock import patch, MagicMock
 
 
@@ -156,6 +157,32 @@ class TestOrder(unittest.TestCase):
             updated_order = Order.get_by_id(order.id)
             self.assertEqual(updated_order.status, status)
 
+    def test_update_status_detects_concurrent_change(self):
+        """
+        Test a status update made from a stale status is refused.
+
+        Validates:
+            - A valid transition is applied
+            - A transition from a status changed elsewhere is refused
+            - The concurrent change is kept
+        """
+        order = Order(**self.order_data)
+        order.save()
+
+        self.assertTrue(order.update_status(Order.Status.CONFIRMED))
+        self.assertEqual(order.status, Order.Status.CONFIRMED)
+
+        # Another request cancels the order behind this instance's back
+        db.session.execute(
+            Order.__table__.update()
+            .where(Order.id == order.id)
+            .values(status=Order.Status.CANCELLED)
+        )
+
+        self.assertFalse(order.update_status(Order.Status.PREPARING))
+        db.session.expire(order)
+        self.assertEqual(order.status, Order.Status.CANCELLED)
+
     def test_invalid_order_status(self):
         """
         Test setting invalid order status.
@@ -214,7 +241,8 @@ class TestOrder(unittest.TestCase):
 
         with patch('models.order.db.session') as mock_session:
             mock_session.commit.side_effect = [
-                SQLAlchemyError("Concurrent update detected"),
+                OperationalError("UPDATE orders", {},
+                                 Exception(1213, "Deadlock found")),
                 None
             ]
 
@@ -251,6 +279,187 @@ class TestOrder(unittest.TestCase):
         for i in range(len(user_orders) - 1):
             self.assertGreater(user_orders[i].date, user_orders[i + 1].date)
 
+    def test_get_user_orders(self):
+        """
+        Test retrieving a user's orders with an optional status filter.
+
+        Validates:
+            - Orders are returned newest first
+            - The status filter narrows the result
+            - limit and offset page through the history
+            - Summary listings leave the heavy columns unloaded
+        """
+        older = Order(**{**self.order_data,
+                         'date': datetime.now(UTC) - timedelta(days=1)})
+        older.save()
+        newer = Order(**self.order_data)
+        newer.save()
+        newer.update_status(Order.Status.CONFIRMED)
+
+        self.assertEqual(Order.get_user_orders(self.test_user.id),
+                         [newer, older])
+        self.assertEqual(
+            Order.get_user_orders(self.test_user.id, Order.Status.PENDING),
+            [older])
+
+        self.assertEqual(Order.get_user_orders(self.test_user.id, limit=1),
+                         [newer])
+        self.assertEqual(
+            Order.get_user_orders(self.test_user.id, limit=1, offset=1),
+            [older])
+        self.assertEqual(Order.get_user_orders(self.test_user.id, limit=2),
+                         [newer, older])
+
+        db.session.expunge_all()
+        summaries = Order.get_user_orders(self.test_user.id, summary=True)
+        self.assertEqual([order.id for order in summaries],
+                         [newer.id, older.id])
+        self.assertNotIn('items', summaries[0].__dict__)
+        self.assertIn('total', summaries[0].__dict__)
+
+    def test_best_sellers(self):
+        """
+        Test ranking menu items by quantity ordered.
+
+        Validates:
+            - Quantities are summed across orders
+            - Orders before the window and cancelled orders are ignored
+            - The result is limited and sorted by quantity
+        """
+        now = datetime.now(UTC)
+        for items, date, status in [
+            ({"burger": {"quantity": 2}, "fries": {"quantity": 1}}, now, "pending"),
+            ({"burger": {"quantity": 1}, "soda": {"quantity": 4}}, now, "delivered"),
+            ({"fries": {"quantity": 9}}, now - timedelta(days=30), "delivered"),
+            ({"fries": {"quantity": 9}}, now, "cancelled"),
+        ]:
+            Order(**{**self.order_data, "items": items, "date": date,
+                     "status": status}).save()
+
+        since = now - timedelta(days=7)
+        self.assertEqual(Order.best_sellers(since),
+                         [("soda", 4), ("burger", 3), ("fries", 1)])
+        self.assertEqual(Order.best_sellers(since, limit=1), [("soda", 4)])
+
+    def test_calculate_total(self):
+        """
+        Test pricing an order from its menu items.
+
+        Validates:
+            - Base and topping prices are multiplied by quantity
+            - Menu items are fetched in a single query
+            - A missing menu item is reported
+        """
+        burger = MenuItem(name="Burger", price=10.0, category="Burgers",
+                          toppings=[{"name": "cheese", "price": 1.5}])
+        fries = MenuItem(name="Fries", price=4.0, category="Sides")
+        db.session.add_all([burger, fries])
+        db.session.commit()
+
+        order = Order(user_id=self.test_user.id, total=1.0, items={
+            burger.id: {"quantity": 2, "toppings": ["cheese"]},
+            fries.id: {"quantity": 1}
+        })
+
+        with patch('models.order.MenuItem.get_by_ids',
+                   wraps=MenuItem.get_by_ids) as mock_get_by_ids:
+            self.assertEqual(order.calculate_total(), 27.0)
+        mock_get_by_ids.assert_called_once()
+
+        order.items = {**order.items, "missing": {"quantity": 1}}
+        with self.assertRaises(ValueError) as context:
+            order.calculate_total()
+        self.assertIn("missing not found", str(context.exception))
+
+    def test_snapshot_prices(self):
+        """
+        Test recording unit prices when an order is placed.
+
+        Validates:
+            - Each line stores its unit price including toppings
+            - The order total is set from those prices
+            - Later menu price changes do not alter the total
+            - Totals of priced orders need no menu lookup
+        """
+        burger = MenuItem(name="Burger", price=10.0, category="Burgers",
+                          toppings=[{"name": "cheese", "price": 1.5}])
+        db.session.add(burger)
+        db.session.commit()
+
+        order = Order(user_id=self.test_user.id, total=1.0, items={
+            burger.id: {"quantity": 2, "toppings": ["cheese"]}
+        })
+        order.snapshot_prices()
+
+        self.assertEqual(order.unit_prices[burger.id], 11.5)
+        self.assertEqual(order.total, 23.0)
+
+        burger.price = 12.0
+        db.session.commit()
+
+        with patch('models.order.MenuItem.get_by_ids') as mock_get_by_ids:
+            self.assertEqual(order.calculate_total(), 23.0)
+        mock_get_by_ids.assert_not_called()
+
+    def test_client_unit_price_ignored(self):
+        """
+        Test that a unit_price supplied inside the items is not trusted.
+
+        Validates:
+            - validate rejects lines carrying a unit_price
+            - calculate_total and snapshot_prices price from the menu
+        """
+        burger = MenuItem(name="Burger", price=10.0, category="Burgers")
+        db.session.add(burger)
+        db.session.commit()
+
+        order = Order(user_id=self.test_user.id, total=1.0, items={
+            burger.id: {"quantity": 2, "unit_price": 0.01}
+        })
+
+        with self.assertRaises(ValueError) as context:
+            order.validate()
+        self.assertIn("Unit price cannot be set", str(context.exception))
+
+        self.assertEqual(order.calculate_total(), 20.0)
+        order.snapshot_prices()
+        self.assertEqual(order.unit_prices[burger.id], 10.0)
+        self.assertEqual(order.total, 20.0)
+
+    def test_serialize_many(self):
+        """
+        Test serializing several orders with one menu item lookup.
+
+        Validates:
+            - Menu items for all orders are fetched in a single query
+            - Each order's lines carry their menu item details
+            - Output matches to_dict for each order
+        """
+        burger = MenuItem(name="Burger", price=10.0, category="Burgers")
+        fries = MenuItem(name="Fries", price=4.0, category="Sides")
+        db.session.add_all([burger, fries])
+        db.session.commit()
+
+        orders = [
+            Order(user_id=self.test_user.id, total=10.0,
+                  items={burger.id: {"quantity": 1}}),
+            Order(user_id=self.test_user.id, total=14.0,
+                  items={burger.id: {"quantity": 1},
+                         fries.id: {"quantity": 1}})
+        ]
+        for order in orders:
+            order.save()
+
+        with patch('models.order.MenuItem.get_by_ids',
+                   wraps=MenuItem.get_by_ids) as mock_get_by_ids:
+            serialized = Order.serialize_many(orders)
+        mock_get_by_ids.assert_called_once()
+
+        self.assertEqual(serialized[0]["items"][burger.id]["item"]["name"],
+                         "Burger")
+        self.assertEqual(set(serialized[1]["items"]), {burger.id, fries.id})
+        self.assertEqual(serialized, [order.to_dict() for order in orders])
+
 
 if __name__ == '__main__':
     unittest.main()
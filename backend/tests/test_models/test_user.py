@@ -4,11 +4,12 @@ Unit tests for User model.
 This module contains comprehensive test cases for the User class,
 including authentication, data validation, and relationship handling.
 """
+import bcrypt
 import unittest
-from datetime import datetime, UTC
+from datetime import datetime, timedelta, UTC
 from unittest.mock import patch, Mock
 from app import create_app, db
-from models.user import User
+from models.user import LOGIN_ATTEMPT_TIMEOUT, User
 from models.order import Order
 from sqlalchemy.exc import SQLAlchemyError
 from unittest.mock import MagicMock
@@ -81,6 +82,16 @@ class TestUser(unittest.TestCase):
             self.assertIsInstance(self.user.password_hash, str)
             self.assertTrue(self.user.check_password(password))
 
+    def test_password_hash_format(self):
+        """Test hashes use the configured cost and verify existing hashes."""
+        self.user.set_password("Securepassword123")
+        self.assertTrue(self.user.password_hash.startswith("$2b$04$"))
+
+        existing_hash = bcrypt.hashpw(b"Legacypassword1",
+                                      bcrypt.gensalt(rounds=4))
+        self.user.password_hash = existing_hash.decode('utf-8')
+        self.assertTrue(self.user.check_password("Legacypassword1"))
+
     def test_empty_password(self):
         """Test handling of empty passwords."""
         with self.assertRaises(ValueError):
@@ -89,6 +100,65 @@ class TestUser(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.user.set_password(None)
 
+    def test_login_attempts_recorded(self):
+        """Test that password checks update the stored login counters."""
+        self.user.set_password('Password123')
+        db.session.add(self.user)
+        db.session.commit()
+
+        self.assertFalse(self.user.check_password('Wrongpassword1'))
+        self.assertFalse(self.user.check_password('Wrongpassword1'))
+        self.assertEqual(self.user.login_attempts, 2)
+
+        self.assertTrue(self.user.check_password('Password123'))
+        self.assertEqual(self.user.login_attempts, 0)
+        self.assertIsNotNone(self.user.last_login)
+
+        # Five failures lock the account until the window passes
+        for _ in range(5):
+            self.assertFalse(self.user.check_password('Wrongpassword1'))
+        self.assertEqual(self.user.login_attempts, 5)
+        self.assertFalse(self.user.check_password('Password123'))
+
+        # Move the last failure back past the lockout window
+        self.user.last_failed_login = datetime.now(UTC) - timedelta(
+            minutes=LOGIN_ATTEMPT_TIMEOUT + 1)
+        db.session.commit()
+
+        self.assertTrue(self.user.check_password('Password123'))
+        self.assertEqual(self.user.login_attempts, 0)
+
+    def test_failure_after_lockout_restarts_count(self):
+        """Test that a failure after the window starts a fresh count."""
+        self.user.set_password('Password123')
+        self.user.login_attempts = 5
+        self.user.last_failed_login = datetime.now(UTC) - timedelta(
+            minutes=LOGIN_ATTEMPT_TIMEOUT + 1)
+        db.session.add(self.user)
+        db.session.commit()
+
+        self.assertFalse(self.user.check_password('Wrongpassword1'))
+        self.assertEqual(self.user.login_attempts, 1)
+        self.assertTrue(self.user.check_password('Password123'))
+
+    def test_rehash_on_login_below_configured_cost(self):
+        """Test that a hash below the configured cost is upgraded on login."""
+        self.user.set_password('Password123')
+        db.session.add(self.user)
+        db.session.commit()
+
+        self.app.config['BCRYPT_LOG_ROUNDS'] = 5
+        self.assertTrue(self.user.check_password('Password123'))
+        self.assertTrue(self.user.password_hash.startswith('$2b$05$'))
+        self.assertTrue(self.user.check_password('Password123'))
+
+    def test_email_length_limit(self):
+        """Test that over-long emails fail validation before the regex."""
+        self.user.set_password('Password123')
+        self.user.email = 'a' * User.EMAIL_MAX_LENGTH + '@example.com'
+        with self.assertRaises(ValueError):
+            self.user.validate()
+
     def test_user_repr(self):
         """Test string representation of User."""
         self.user.id = 'test-id'
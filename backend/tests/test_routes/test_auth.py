@@ -8,7 +8,8 @@ from datetime import datetime, timedelta, UTC
 from flask import current_app
 from unittest.mock import patch, MagicMock
 from models.user import User
-from routes.auth import token_required
+from routes import auth
+from routes.auth import decode_access_token, token_required
 
 
 class TestAuthRoutes(unittest.TestCase):
@@ -83,6 +84,49 @@ class TestAuthRoutes(unittest.TestCase):
             'Email already exists'
         )
 
+    def add_user(self, username, email):
+        """Store a user directly, bypassing the signup route"""
+        user = User(username=username, email=email)
+        user.set_password('Password123')
+        db.session.add(user)
+        db.session.commit()
+
+    def test_signup_username_underscore_not_wildcard(self):
+        """Test an underscore in a username only matches an underscore"""
+        self.add_user('axb', 'axb@example.com')
+        response = self.client.post(
+            '/api/auth/signup',
+            data=json.dumps({'username': 'a_b', 'email': 'ab@example.com',
+                             'password': 'Password123!'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.post(
+            '/api/auth/signup',
+            data=json.dumps({'username': 'a_b', 'email': 'other@example.com',
+                             'password': 'Password123!'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data)['message'],
+                         'Username already exists')
+
+    def test_signup_email_conflict_reported_first(self):
+        """Test the email error wins when both fields are taken by others"""
+        self.add_user('nameowner', 'name@example.com')
+        self.add_user('emailowner', 'taken@example.com')
+        response = self.client.post(
+            '/api/auth/signup',
+            data=json.dumps({'username': 'nameowner',
+                             'email': 'taken@example.com',
+                             'password': 'Password123!'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data)['message'],
+                         'Email already exists')
+
     def test_login_success(self):
         """Test successful login"""
         signup_response = self.client.post(
@@ -165,5 +209,69 @@ class TestAuthRoutes(unittest.TestCase):
         )
 
 
+class TestDecodeAccessToken(unittest.TestCase):
+    """Test cases for the verified access-token cache"""
+
+    def setUp(self):
+        """Push an app context and start from an empty token cache"""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        auth._jwt_cache.clear()
+        self.addCleanup(auth._jwt_cache.clear)
+
+    def tearDown(self):
+        """Pop the app context"""
+        self.app_context.pop()
+
+    def make_token(self, token_type='access', expires_in=3600):
+        """Sign a token with the app's secret key"""
+        return jwt.encode(
+            {
+                'id': 'user-id',
+                'exp': datetime.now(UTC) + timedelta(seconds=expires_in),
+                'type': token_type
+            },
+            current_app.config['SECRET_KEY'],
+            algorithm="HS256"
+        )
+
+    def test_cache_hit_skips_decode(self):
+        """Test a repeat token is served without verifying it again"""
+        token = self.make_token()
+        with patch('routes.auth.jwt.decode', wraps=jwt.decode) as mock_decode:
+            self.assertEqual(decode_access_token(token)['id'], 'user-id')
+            self.assertEqual(decode_access_token(token)['id'], 'user-id')
+        self.assertEqual(mock_decode.call_count, 1)
+
+    def test_entry_capped_at_token_exp(self):
+        """Test a cached entry does not outlive the token's exp claim"""
+        token = self.make_token()
+        # Claims whose exp has already passed are stored already expired
+        claims = {'id': 'user-id', 'type': 'access',
+                  'exp': datetime.now(UTC).timestamp() - 1}
+        with patch('routes.auth.jwt.decode', return_value=claims) as mock_decode:
+            decode_access_token(token)
+            decode_access_token(token)
+        self.assertEqual(mock_decode.call_count, 2)
+
+    def test_refresh_token_rejected(self):
+        """Test a refresh token is refused and never cached"""
+        token = self.make_token(token_type='refresh')
+        for _ in range(2):
+            with self.assertRaises(jwt.InvalidTokenError):
+                decode_access_token(token)
+        self.assertEqual(len(auth._jwt_cache), 0)
+
+    def test_secret_rotation_invalidates_cache(self):
+        """Test tokens verified under an old key are not reused"""
+        token = self.make_token()
+        decode_access_token(token)
+
+        self.app.config['SECRET_KEY'] = 'rotated-secret'
+        with self.assertRaises(jwt.InvalidSignatureError):
+            decode_access_token(token)
+
+
 if __name__ == '__main__':
     unittest.main()